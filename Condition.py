@@ -1,30 +1,72 @@
 from enum import Enum
+from array import array
 
 
-""" 
+"""
 Hannah Brown, 10/20/19
  * A Condition represents a set of clauses representing one idea that may need
- * to be repeated for many different variables (for example, across all 
+ * to be repeated for many different variables (for example, across all
  * characters in a string)
  * The num_repeats option and increment option in the class provide a way to
  * describe this repition without having to construct all the clauses and  hold
  * them in memory (it takes a lot of memory)
+ * The clauses themselves are stored back to back in one flat array of 32 bit
+ * literals, with a second array holding the offset where each clause starts
+ * (clause c is literals[offsets[c]:offsets[c + 1]]). That takes about 12 bytes
+ * for a two literal clause instead of well over 100 for a list of ints.
 """
 class Condition:
-    clauses = list() # this should now be a list of numbers to allow for easier printing
-    repeat = False # Whether these clauses repeat or not
-    num_repeats = 1 # num_repeats = 1 means the condition doesn't repeat
-    increment = 0 # What to add to each variable when the clauses are repeated
+    __slots__ = ("literals", "offsets", "index", "repeat", "num_repeats", "increment")
 
-    def __init__(self, clauses = list(), repeat = False,  num_repeats = 1, increment = 0):
-        self.clauses = clauses
-        self.repeat = repeat
-        self.num_repeats = num_repeats
-        self.increment = increment
+    # conditions with at most this many literals keep their formatted blocks
+    # between repeats, bigger ones format each block again on every repeat
+    # rather than holding a text copy of the whole condition in memory
+    MAX_CACHED_LITERALS = 1 << 20
+
+    def __init__(self, clauses = None, repeat = False,  num_repeats = 1, increment = 0):
+        self.literals = array("i") # every literal of every clause, in order
+        self.offsets = array("I", [0]) # where each clause starts in literals, plus the end
+        self.index = None # set of clause tuples, only built once a membership test needs it
+        self.repeat = repeat # Whether these clauses repeat or not
+        self.num_repeats = num_repeats # num_repeats = 1 means the condition doesn't repeat
+        self.increment = increment # What to add to each variable when the clauses are repeated
+
+        if clauses is not None:
+            self.set_clauses(clauses)
+
+    def __len__(self):
+        # number of clauses, not counting repeats
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        for c in range(0, len(self)):
+            yield self.get_clause(c)
+
+    def __contains__(self, clause):
+        # the first membership test builds a set of the clauses as tuples, which
+        # add_clause then keeps up to date. Conditions that are only written
+        # never pay for it.
+        if self.index is None:
+            self.index = set(tuple(clause) for clause in self)
+
+        return tuple(clause) in self.index
+
+    @property
+    def clauses(self):
+        # the clauses as a list of lists, built on demand
+        return list(self)
+
+    def get_clause(self, c):
+        return self.literals[self.offsets[c]:self.offsets[c + 1]].tolist()
 
     def set_clauses(self, clauses):
-        self.clauses = clauses
-    
+        self.literals = array("i")
+        self.offsets = array("I", [0])
+        self.index = None
+
+        for clause in clauses:
+            self.add_clause(clause)
+
     def set_repeat(self, repeat):
         self.repeat = repeat
 
@@ -33,30 +75,80 @@ class Condition:
 
     def set_increment(self, increment):
         self.increment = increment
-            
+
     def add_clause(self, clause):
-        self.clauses.append(clause)
+        self.literals.extend(clause)
+        self.offsets.append(len(self.literals))
+
+        if self.index is not None:
+            self.index.add(tuple(clause))
+
+    def add_clauses(self, literals, length):
+        # add clauses of the same length from one flat array of literals, which
+        # is much faster than adding them one at a time for big conditions
+        start = len(self.literals)
+        self.literals.extend(literals)
+        self.offsets.extend(range(start + length, len(self.literals) + 1, length))
+
+        if self.index is not None:
+            self.index.update(tuple(literals[i:i + length]) for i in range(0, len(literals), length))
+
+    def iter_repeated(self):
+        # every clause with its repeats, shifted the same way write_condition
+        # shifts them, for feeding the condition to an in-process solver
+        num_repeats = self.num_repeats if self.repeat else 1
+
+        for x in range(0, num_repeats):
+            shift = x * self.increment
+
+            for clause in self:
+                if shift == 0:
+                    yield clause
+                else:
+                    yield [y + shift if y > 0 else y - shift for y in clause]
+
+    def iter_blocks(self, block_size = 4096):
+        # Split the clauses into blocks of at most block_size clauses. Each block
+        # is a format string with the signs of the literals baked in, plus the
+        # magnitudes of its literals, so a repeat of the block only needs the
+        # magnitudes shifted by x * increment and a single % to be formatted.
+        literals = self.literals
+        offsets = self.offsets
+
+        for start in range(0, len(self), block_size):
+            end = min(start + block_size, len(self))
+            block = literals[offsets[start]:offsets[end]]
+
+            if 0 in block:
+                raise Exception("ERROR: 0 found in a clause")
+
+            template = list()
+
+            for c in range(start, end):
+                for y in literals[offsets[c]:offsets[c + 1]]:
+                    template.append("-%d " if y < 0 else "%d ")
+                template.append("0\n")
+
+            yield "".join(template), [abs(y) for y in block]
 
     def write_condition(self, out_file):
         # print the condition to a file w/ proper repeats
         # Loop over clauses, incrementing w/ first increment
         # then loop over clauses w/ subsequent increments until done
+        # Negative literals move down by x * increment and positive ones move up,
+        # which is the same as adding x * increment to every magnitude.
+        num_repeats = self.num_repeats if self.repeat else 1
+
+        if len(self.literals) <= self.MAX_CACHED_LITERALS:
+            blocks = list(self.iter_blocks())
+        else:
+            blocks = None
+
+        for x in range(0, num_repeats):
+            shift = x * self.increment
 
-        for x in self.clauses:
-            for y in x:
-                if y == 0:
-                    raise Exception("ERROR: 0 found in a clause")
-                print(y, end=" ", file=out_file)
-            print("0", file=out_file)
-
-        if self.repeat:
-            for x in range(1, self.num_repeats):
-                for y in self.clauses:
-                    for z in y:               
-                        if z < 0:
-                            print(str(z - x * self.increment), end=" ", file=out_file)
-                        else:
-                            print(str(z + x * self.increment), end=" ", file=out_file)
-
-                                            
-                    print("0", file=out_file)
\ No newline at end of file
+            for template, magnitudes in (blocks if blocks is not None else self.iter_blocks()):
+                if shift == 0:
+                    out_file.write(template % tuple(magnitudes))
+                else:
+                    out_file.write(template % tuple([m + shift for m in magnitudes]))
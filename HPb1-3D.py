@@ -25,13 +25,10 @@ arg1 = sys.argv[1]
 arg2 = sys.argv[2]
 
 INFILE = open(arg1, "r")  # open the file specified by the value of arg1, to read from the file.
-OUT = open(arg2, "w")     # open the file specified by the value of arg2, to write to the file.
+OUT = open(arg2, "w", 1 << 20)     # open the file specified by the value of arg2, to write to the file, with a 1 MB buffer
+                                  # since the LP is written to it a few terms at a time as it is generated.
 
 sequence = ""
-constraints = "\n"  # assign the string `such that \n\n' to the variable `constraints'
-objective = ""
-Econstraints = ""
-binaries = "binary \n"
 
 for sequence in INFILE:
     sequence = sequence.rstrip()
@@ -53,38 +50,72 @@ diamsquared = diam**2
 diamcubic = diam**3
 
 
-# loop through the edges in the diam-by-diam grid to set up
-# the objective function, and also set up the inequalities to count 
-# the number of edges whose endpoints are both assigned a character whose
-# value is 1.
-
-k = 1
-kp1 = 0
+# The LP is streamed to OUT section by section instead of being built up in strings and written at the end, which took
+# time quadratic in its size. The objective, the constraints, the edge constraints and the binaries are written in that
+# order, so the loops over the edges of the grid and over the positions run once for each section that lists them.
 
-for z  in range(1, diam+1):
+def plane_edges(z):
+    # the edges of the diam-by-diam-by-diam grid from the points in plane z, as pairs of points: horizontal, vertical
+    # and z edges of each point in turn
+    k = (z - 1) * diamsquared + 1
     for i  in range(1, diam+1):
         for j  in range(1, diam+1):
             if j < diam:
-                kp1 = k + 1 # horizontal edges
-                objective = objective + "+ C"+ str(k) + "," + str(kp1) + " "
-                Econstraints = Econstraints + "I" + str(k) + " + I" + str(kp1) + " - 2 C" + str(k) + "," + str(kp1) + " >= 0\n"  # C can be set to 1 only if both endpoints are assigned 1s. 
-                binaries = binaries + "C" + str(k) + "," + str(kp1) + "\n"
+                yield k, k + 1 # horizontal edges
 
             if i < diam:
-                kpn = k + diam # vertical edges
-                objective = objective + "+ C" + str(k) + "," + str(kpn) + " "
-                Econstraints = Econstraints + "I" + str(k) + " + I" + str(kpn) + " - 2 C" + str(k) + "," + str(kpn) + " >= 0\n"
-                binaries = binaries + "C" + str(k) + "," + str(kpn) + "\n"
+                yield k, k + diam # vertical edges
 
             if z < diam:
-                kpz = k + diamsquared # z edges
-                objective = objective + "+ C" + str(k) + "," + str(kpz) + " "
-                Econstraints = Econstraints + "I" + str(k) + " + I" + str(kpz) + " - 2 C" + str(k) + "," + str(kpz) + " >= 0\n"
-                binaries = binaries + "C" + str(k) + "," + str(kpz) + "\n"
+                yield k, k + diamsquared # z edges
 
             k += 1
-    print('z: %d k: %d' % (z,k-1))
-    #k += 1   # increment k to account for the last node in each row.
+
+def edges():
+    for z  in range(1, diam+1):
+        for edge in plane_edges(z):
+            yield edge
+
+# the Offset follows the objective, so the 1s of the sequence are counted before anything is written
+
+inputs  = list(sequence)
+ones = {}
+lastchar = 0
+neighbors1 = 0
+
+for char in range(0, n):        # use hash %ones to record the positions of the 1s in the sequence, and count
+                               # the number of adjacent 1s. The objective function is reduced by that count.        
+    print('%d %s' % (char,inputs[char])) 
+
+    if inputs[char] == '1':
+        if lastchar == 1:
+            neighbors1 += 1   
+        ones[char] = 1
+        lastchar = 1
+
+    else:
+        lastchar = 0
+
+print('Neighbor count: %d ' % neighbors1) 
+
+OUT.write("Maximize \n")  # write to file the string (word) 'Maximize' and move to a new line (because of '\n')
+#OUT.write(objective + "- Offset \n\n") #DG change Dec. 16, 2018
+OUT.write("S \n") #DG added Dec. 16, 2018
+OUT.write("subject to \n")
+# OUT.write("S >= 15\n")
+
+# loop through the edges in the diam-by-diam grid to set up
+# the objective function. The inequalities to count the number of edges whose
+# endpoints are both assigned a character whose value is 1 follow the other constraints.
+
+for z  in range(1, diam+1):
+    for k, kp in plane_edges(z):
+        OUT.write("+ C" + str(k) + "," + str(kp) + " ")
+    print('z: %d k: %d' % (z, z * diamsquared))
+
+OUT.write("- Offset - S = 0 \n\n") # DG added Dec. 16, 2018
+OUT.write("Offset = " + str(neighbors1) + "\n")
+OUT.write("\n")
 
 # HB modified midpoint calculation below 8/29 
 midpoint = math.ceil(diam/2) * diamsquared - (diam//2 - 1) * (diam + 1)  # DG added July 13, 2019 in order to try to speed up the ILP
@@ -100,18 +131,17 @@ midpoint2 = midpoint - diamsquared
 
 for i in range(1, n+1):   # set up inequalities to ensure each character is assigned to one position
     for pos in range(1, diamcubic+1):
-        constraints = constraints + "+ X" + str(i) + "," + str(pos) + " "
-        binaries = binaries + "X" + str(i) + "," + str(pos) + "\n"
+        OUT.write("+ X" + str(i) + "," + str(pos) + " ")
 
 
-    constraints = constraints + "=  1 \n"
+    OUT.write("=  1 \n")
 
 
 for pos in range(1, diamcubic+1):   # set up inequalties to ensure each position is assigned at most one character
     for i in range (1, n+1):
-        constraints = constraints + "+ X" + str(i) + "," + str(pos) + " "
+        OUT.write("+ X" + str(i) + "," + str(pos) + " ")
 
-    constraints = constraints + "<= 1 \n"
+    OUT.write("<= 1 \n")
 
 
 # create inequalities to ensure that chars i and i+1 are neighbors on the grid
@@ -134,8 +164,8 @@ for plane in range(2, diam):       # middle planes
                 pointzz = point - diamsquared # front point
 
 
-                constraints = constraints + "X" + str(i) + "," + str(point) + " "
-                constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0 \n" 
+                OUT.write("X" + str(i) + "," + str(point) + " ")
+                OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0 \n")
         #constraints = constraints + "end of middle rows and first plane\n"        
         gridbase += diam
 #        OUT.write ("After row: the gridbase is now %d \n" % gridbase)
@@ -160,8 +190,8 @@ for row in range(2, diam):     # middle rows of first plane
             pointzz = point - diamsquared # front point
 
 
-            constraints = constraints + "X" + str(i) + "," + str(point) + " "
-            constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz)+ " <= 0\n"
+            OUT.write("X" + str(i) + "," + str(point) + " ")
+            OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz)+ " <= 0\n")
     #constraints = constraints + "end of middle rows and first plane\n"        
     gridbase += diam
 
@@ -181,8 +211,8 @@ for row in range(2, diam):     # middle rows of last plane
             pointzz = point - diamsquared # front point
 
 
-            constraints = constraints + "X" + str(i) + "," + str(point) + " "
-            constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointzz)+ " <= 0\n"
+            OUT.write("X" + str(i) + "," + str(point) + " ")
+            OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointzz)+ " <= 0\n")
     #constraints = constraints + "end of middle rows of last plane\n"        
     gridbase += diam
 
@@ -205,8 +235,8 @@ for plane in range(2, diam):       # middle planes
             pointpz = point + diamsquared # back point
             pointzz = point - diamsquared # front point
 
-            constraints = constraints + "X" + str(i) + "," + str(point) + " "
-            constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n"
+            OUT.write("X" + str(i) + "," + str(point) + " ")
+            OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n")
 
             if pointn1 < 0:
                 print("YIKES1.1\n")
@@ -228,8 +258,8 @@ for plane in range(2, diam):       # middle planes
             pointpz = point + diamsquared # back point
             pointzz = point - diamsquared # front point
 
-            constraints = constraints + "X" + str(i) + "," + str(point) + " "
-            constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n"
+            OUT.write("X" + str(i) + "," + str(point) + " ")
+            OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n")
 
             if pointn1 < 0:
                 print("YIKES1.2\n")
@@ -255,8 +285,8 @@ for plane in range(2, diam):       # middle planes
             pointpz = point + diamsquared # back point
             pointzz = point - diamsquared # front point
 
-            constraints = constraints + "X" + str(i) + "," + str(point) + " "
-            constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n"
+            OUT.write("X" + str(i) + "," + str(point) + " ")
+            OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n")
 
             if pointn1 < 0:
                 print("YIKES1.1\n")
@@ -278,8 +308,8 @@ for plane in range(2, diam):       # middle planes
             pointpz = point + diamsquared # back point
             pointzz = point - diamsquared # front point
 
-            constraints = constraints + "X" + str(i) + "," + str(point) + " "
-            constraints = constraints + "- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n"
+            OUT.write("X" + str(i) + "," + str(point) + " ")
+            OUT.write("- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n")
 
             if pointn1 < 0:
                 print("YIKES1.2\n")
@@ -303,8 +333,8 @@ for offset in range(0, diam-2):# take care of the fisrt plane's first row of the
         pointpz = point + diamsquared # back point
         pointzz = point - diamsquared # front point
 
-        constraints = constraints + "X" + str(i) + "," + str(point) + " "
-        constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointpz) + " <= 0\n"
+        OUT.write("X" + str(i) + "," + str(point) + " ")
+        OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointpz) + " <= 0\n")
 
         if pointn1 < 0:
             print("YIKES1\n")
@@ -324,8 +354,8 @@ for offset in range(0, diam-2):# take care of the first plane's last row of the
         pointpz = point + diamsquared # back point
         pointzz = point - diamsquared # front point
 
-        constraints = constraints + "X" + str(i) + "," + str(point) + " "
-        constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " <= 0\n"
+        OUT.write("X" + str(i) + "," + str(point) + " ")
+        OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " <= 0\n")
 
         if pointn1 < 0:
             print("YIKES2\n")
@@ -343,8 +373,8 @@ for offset in range (0, diam-2): # take care of the first plane's first column m
         pointpz = point + diamsquared # back point
         pointzz = point - diamsquared # front point
 
-        constraints = constraints + "X" + str(i) + "," + str(point) + " "
-        constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " <= 0\n"
+        OUT.write("X" + str(i) + "," + str(point) + " ")
+        OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " <= 0\n")
 
         if pointn1 < 0:
             print("YIKES3")
@@ -362,8 +392,8 @@ for offset in range(0, diam-2): # take care of the first planes' last column min
         pointpz = point + diamsquared # back point
         pointzz = point - diamsquared # front point
 
-        constraints = constraints + "X" + str(i) + "," + str(point) + " "
-        constraints = constraints + "- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " <= 0\n"
+        OUT.write("X" + str(i) + "," + str(point) + " ")
+        OUT.write("- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " <= 0\n")
 
         if pointn1 < 0:
             print("YIKES4")
@@ -388,8 +418,8 @@ for offset in range(0, diam-2):# take care of the last plane's first row of the
         pointpz = point + diamsquared # back point
         pointzz = point - diamsquared # front point
 
-        constraints = constraints + "X" + str(i) + "," + str(point) + " "
-        constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n"
+        OUT.write("X" + str(i) + "," + str(point) + " ")
+        OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n")
 
         if pointn1 < 0:
             print("YIKES1\n")
@@ -409,8 +439,8 @@ for offset in range(0, diam-2):# take care of the last plane's last row of the g
         pointpz = point + diamsquared # back point
         pointzz = point - diamsquared # front point
 
-        constraints = constraints + "X" + str(i) + "," + str(point) + " "
-        constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n"
+        OUT.write("X" + str(i) + "," + str(point) + " ")
+        OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n")
 
         if pointn1 < 0:
             print("YIKES2\n")
@@ -428,8 +458,8 @@ for offset in range (0, diam-2): # take care of the last plane's first column mi
         pointpz = point + diamsquared # back point
         pointzz = point - diamsquared # front point
 
-        constraints = constraints + "X" + str(i) + "," + str(point) + " "
-        constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n"
+        OUT.write("X" + str(i) + "," + str(point) + " ")
+        OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n")
 
         if pointn1 < 0:
             print("YIKES3")
@@ -447,8 +477,8 @@ for offset in range(0, diam-2): # take care of the last planes' last column minu
         pointpz = point + diamsquared # back point
         pointzz = point - diamsquared # front point
 
-        constraints = constraints + "X" + str(i) + "," + str(point) + " "
-        constraints = constraints + "- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n"
+        OUT.write("X" + str(i) + "," + str(point) + " ")
+        OUT.write("- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n")
 
         if pointn1 < 0:
             print("YIKES4")
@@ -473,25 +503,25 @@ for plane  in  range(2, diam):
 
               
             if point == checker[0]:
-                constraints = constraints + "X" + str(i) + "," + str(point) + " "
-                constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n"
+                OUT.write("X" + str(i) + "," + str(point) + " ")
+                OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n")
 
                 if pointn1 < 0:
                     print("YIKES5")
 
             if point == checker[2]:
-                constraints = constraints + "X" + str(i) + "," + str(point) + " "
-                constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n"
+                OUT.write("X" + str(i) + "," + str(point) + " ")
+                OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n")
 
 
             if point == checker[1]:
-                constraints = constraints + "X" + str(i) + "," + str(point) + " "
-                constraints = constraints + "- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n"
+                OUT.write("X" + str(i) + "," + str(point) + " ")
+                OUT.write("- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n")
 
 
             if point == checker[3]:
-                constraints = constraints + "X" + str(i) + "," + str(point) + " "
-                constraints = constraints + "- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n"
+                OUT.write("X" + str(i) + "," + str(point) + " ")
+                OUT.write("- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0\n")
 
                 if pointn1 < 0:
                     print("YIKES6")
@@ -521,112 +551,100 @@ for i  in range(1, n):
 
           
         if point == 1:
-            constraints = constraints + "X" + str(i) + "," + str(point) + " "
-            constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointpz) + " <= 0 \n"
+            OUT.write("X" + str(i) + "," + str(point) + " ")
+            OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointpz) + " <= 0 \n")
 #  bottom plane, top left corner\n"
 
             if pointn1 < 0:
                 print("YIKES5")
 
         if point == diam * (diam - 1) + 1:
-            constraints = constraints + "X" + str(i) + "," + str(point) + " "
-            constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " <= 0 \n"
+            OUT.write("X" + str(i) + "," + str(point) + " ")
+            OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " <= 0 \n")
 #bottom plane, bottom left corner\n"
 
 
         if point == diam:
-            constraints = constraints + "X" + str(i) + "," + str(point) + " "
-            constraints = constraints + "- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointpz) + " <= 0 \n"
+            OUT.write("X" + str(i) + "," + str(point) + " ")
+            OUT.write("- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointpz) + " <= 0 \n")
 # bottom plane, top right corner
 
 
         if point == diamsquared:
-            constraints = constraints + "X" + str(i) + "," + str(point) + " "
-            constraints = constraints + "- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " <= 0 \n"
+            OUT.write("X" + str(i) + "," + str(point) + " ")
+            OUT.write("- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointpz) + " <= 0 \n")
 # bottom plane, bottom right corner 
 
             if pointn1 < 0:
                 print("YIKES6")
 
         if point == checkers[4]:
-            constraints = constraints + "X" + str(i) + "," + str(point) + " "
-            constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0 \n"
+            OUT.write("X" + str(i) + "," + str(point) + " ")
+            OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0 \n")
 #top plane, top left 
 
             if pointn1 < 0:
                 print("YIKES5")
 
         if point == checkers[5]:
-            constraints = constraints + "X" + str(i) + "," + str(point) + " "
+            OUT.write("X" + str(i) + "," + str(point) + " ")
 
-            constraints = constraints + "- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0 \n"
+            OUT.write("- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0 \n")
 # top plane, top right \n"
 #            constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0 top plane, top right \n" DG this seem wrong. The fix is above.
 
 
         if point == checkers[6]:
-            constraints = constraints + "X" + str(i) + "," + str(point) + " "
+            OUT.write("X" + str(i) + "," + str(point) + " ")
 
-            constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0 \n"
+            OUT.write("- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0 \n")
 #top plane, bottom left 
 
 #            constraints = constraints + "- X" + str(ip1) + "," + str(pointp1) + " - X" + str(ip1) + "," + str(pointpn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0 top plane, bottom left \n" # DG this seems wrong. The fix is above.
 
 
         if point == checkers[7]:
-            constraints = constraints + "X" + str(i) + "," + str(point) + " "
-            constraints = constraints + "- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0 \n"
+            OUT.write("X" + str(i) + "," + str(point) + " ")
+            OUT.write("- X" + str(ip1) + "," + str(pointn1) + " - X" + str(ip1) + "," + str(pointnn) + " - X" + str(ip1) + "," + str(pointzz) + " <= 0 \n")
 # top plane, bottom right
 
             if pointn1 < 0:
                 print("YIKES6")
 
 
+
 # Now we create the inequalities to determine if a point has been assigned a 1 or not. Assign I$i to 1 if and only if
 # grid point $i has been assigned a 1
 
-inputs  = list(sequence)
-ones = {}
-lastchar = 0
-neighbors1 = 0
+for pos in range(1, diamcubic+1):
+    for char in sorted(ones.keys()):
+        charp1 = char + 1
+        OUT.write("+ X" + str(charp1) + "," + str(pos) + " ")
 
-for char in range(0, n):        # use hash %ones to record the positions of the 1s in the sequence, and count
-                               # the number of adjacent 1s. The objective function is reduced by that count.        
-    print('%d %s' % (char,inputs[char])) 
+    OUT.write("- I" + str(pos) + " = 0 \n")
 
-    if inputs[char] == '1':
-        if lastchar == 1:
-            neighbors1 += 1   
-        ones[char] = 1
-        lastchar = 1
+OUT.write(" \n\n")
 
-    else:
-        lastchar = 0
+for k, kp in edges():
+    OUT.write("I" + str(k) + " + I" + str(kp) + " - 2 C" + str(k) + "," + str(kp) + " >= 0\n")  # C can be set to 1 only if both endpoints are assigned 1s.
 
-print('Neighbor count: %d ' % neighbors1) 
+OUT.write(" \n\n")
+OUT.write("binary \n")
 
-for pos in range(1, diamcubic+1):
-    assigned1 = ""
-    for char in sorted(ones.keys()):
-        charp1 = char + 1
-        assigned1 = assigned1 + "+ X" + str(charp1) + "," + str(pos) + " "
+for k, kp in edges():
+    OUT.write("C" + str(k) + "," + str(kp) + "\n")
 
-    binaries = binaries + "I" + str(pos) + " \n"
-    constraints = constraints + assigned1 + "- I" + str(pos) + " = 0 \n"
+for i in range(1, n+1):
+    for pos in range(1, diamcubic+1):
+        OUT.write("X" + str(i) + "," + str(pos) + "\n")
+
+for pos in range(1, diamcubic+1):
+    OUT.write("I" + str(pos) + " \n")
 
 
 
 INFILE.close()
-OUT.write("Maximize \n")  # write to file the string (word) 'Maximize' and move to a new line (because of '\n')
-#OUT.write(objective + "- Offset \n\n") #DG change Dec. 16, 2018
-OUT.write("S \n") #DG added Dec. 16, 2018
-OUT.write("subject to \n")
-# OUT.write("S >= 15\n")
-OUT.write(objective + "- Offset - S = 0 \n\n") # DG added Dec. 16, 2018
-OUT.write("Offset = " + str(neighbors1) + "\n")
-OUT.write(constraints + " \n\n")
-OUT.write(Econstraints + " \n\n")
-OUT.write(binaries + " \n")  # write to file the value of the variable 'binaries'
+OUT.write(" \n")
 OUT.write("end")  # write to file the string (word) 'end'
 OUT.close()
 print ("The ILP file is %s \n" %  arg2)
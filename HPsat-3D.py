@@ -9,6 +9,12 @@ import math
 import re
 import time
 from Condition import Condition
+import dimacs
+import symmetry
+import cardinality
+import parity
+import lattice
+import domains
 
 def read_data(file):
     with open(file, "r") as f:
@@ -46,7 +52,7 @@ def repeat_count_condition(count_condition, t_ki, t_k, repeats):
     clauses = list(count_condition.clauses)
 
     for i in range(1, repeats):
-        for c in count_condition.clauses:
+        for c in count_condition:
             new_clause = list()
             last_el = c[len(c) - 1]
 
@@ -69,112 +75,23 @@ def repeat_count_condition(count_condition, t_ki, t_k, repeats):
     count_condition.set_clauses(clauses)
 
 def gen_embedding_conditions(n, grid_width):
-    embedding_conditions = list()
-    grid_area = pow(grid_width, 2)
-    grid_vol = grid_area * grid_width
-
-    # embedding condition 1
-    embedding_condition_1 = Condition([range(1, grid_vol + 1)], True, n, grid_vol)
-    embedding_conditions.append(embedding_condition_1)
-
-    # embedding condition 2
-    embedding_condition_2 = Condition(list(), True, n, grid_vol)
-
-    for i in range(1, grid_vol):
-        for j in range(i + 1, grid_vol + 1):
-            embedding_condition_2.add_clause([-1 * i, -1 * j])
-
-    embedding_conditions.append(embedding_condition_2)
-
-    # embedding condition 3
-    embedding_condition_3 = Condition(list(), True, grid_vol, 1)
-    stop = (n - 1) * grid_vol + 1
-
-    for j in range(1, stop, grid_vol):
-        for i in range(j+grid_vol, stop+1, grid_vol):
-            embedding_condition_3.add_clause([-1 * j, -1 * i])
-    
-    embedding_conditions.append(embedding_condition_3)
-
-    # embedding condition 4
-    embedding_condition_4 = Condition(list(), True, n - 1, grid_vol)
-
-    for j in range(1, grid_vol + 1):
-        clause = list()
-        clause.append(-1 * j)
-
-        if j % grid_width != 0:
-            clause.append(j + grid_vol + 1)
-        if j % grid_width != 1:
-            clause.append(j + grid_vol - 1)
-        if (j % grid_area <= grid_area - grid_width) and j % grid_area != 0:
-            clause.append(j + grid_vol + grid_width)
-        if j % grid_area > grid_width or j % grid_area == 0:
-            clause.append(j + grid_vol - grid_width)
-        if j <= (grid_width - 1) * grid_area:
-            clause.append(j + grid_vol + grid_area)
-        if j > grid_area:
-            clause.append(j + grid_vol - grid_area)
-        
-        embedding_condition_4.add_clause(clause)
-    
-    embedding_conditions.append(embedding_condition_4)
-
-    return embedding_conditions
+    return lattice.gen_embedding_conditions(n, grid_width, 3)
 
 def gen_contact_conditions(n, grid_width, positions_of_ones):
-    grid_area = pow(grid_width, 2)
-    grid_vol = pow(grid_width, 3)
-    offset = grid_vol * n #existing vars from X_ij conditions
-    contact_conditions = list()
-    
-    # contact condition 1
-    contact_condition_1 = Condition(list(), True, grid_vol, 1)    
-    
-    for x in positions_of_ones:
-        contact_condition_1.add_clause([offset + 1, -1 * (x * grid_vol + 1)])
-
-    last_clause = [-1 * (offset + 1)]
-    last_clause.extend(map(lambda x: (x * grid_vol) + 1, positions_of_ones))
-    contact_condition_1.add_clause(last_clause)
-    contact_conditions.append(contact_condition_1)
-
-    # contact condition 2
-    clauses = list()
-
-    for j in range(1, grid_vol + 1):
-        C_jr = offset + grid_vol + j
-        C_jd = C_jr + grid_vol
-        C_jb = C_jd + grid_vol
-        T_j = C_jr - grid_vol
-        T_jr = T_j + 1
-        T_jd = T_j + grid_width
-        T_jb = T_j + grid_area
-
-        if j % grid_width != 0:
-            clauses.extend([[-1 * C_jr, T_j], [-1 * C_jr, T_jr], [C_jr, -1 * T_j, -1 * T_jr]])
-        else:
-            clauses.extend([[-1 * C_jr]])
-        if j % grid_area <= grid_area - grid_width and j % grid_area > 0:
-            clauses.extend([[-1 * C_jd, T_j], [-1 * C_jd, T_jd], [C_jd, -1 * T_j, -1 * T_jd]]) 
-        else:
-            clauses.extend([[-1 * C_jd]])
-        if j <= (grid_width - 1) * grid_area:
-            clauses.extend([[-1 * C_jb, T_j], [-1 * C_jb, T_jb], [C_jb, -1 * T_j, -1 * T_jb]])
-        else:
-            clauses.extend([[-1 * C_jb]])
+    return lattice.gen_contact_conditions(n, grid_width, 3, positions_of_ones)
 
-    contact_condition_2 = Condition(clauses)
-    contact_conditions.append(contact_condition_2)
+def gen_counting_conditions(n, grid_width, r, contact_offset = None, num_contact_condition_vars = None):
+    # the leaves are the num_contact_condition_vars variables after contact_offset,
+    # the usual contact variables unless they're given
+    grid_vol = pow(grid_width, 3)
 
-    return contact_conditions
+    if contact_offset is None:
+        contact_offset = grid_vol * n + grid_vol
+        num_contact_condition_vars = 3 * grid_vol
 
-def gen_counting_conditions(n, grid_width, r):
-    grid_vol = pow(grid_width, 3)
-    num_contact_condition_vars = 3 * grid_vol
     num_tree_levels = math.ceil(math.log(num_contact_condition_vars, 2))
     counting_conditions = list()
-    num_existing_vars = grid_vol * n + grid_vol + num_contact_condition_vars
+    num_existing_vars = contact_offset + num_contact_condition_vars
     num_vars = num_existing_vars
 
     for l in range(1, num_tree_levels - 1):
@@ -190,7 +107,7 @@ def gen_counting_conditions(n, grid_width, r):
         # i and j are the two children of node k.
         for j in range(0, t_ki + 1):
             if l == num_tree_levels - 1:
-                b_j_2k =  -1 * (grid_vol * n + grid_vol + t_ki + j)
+                b_j_2k =  -1 * (contact_offset + t_ki + j)
             else:
                 b_j_2k = num_vars + repeats * t_k + t_ki + j # var number will be the existing number of variables + the number of variables at level k + i
 
@@ -203,7 +120,7 @@ def gen_counting_conditions(n, grid_width, r):
                     continue
 
                 if l == num_tree_levels - 1:
-                    b_i_2k = -1 * (grid_vol * n + grid_vol + i)
+                    b_i_2k = -1 * (contact_offset + i)
                 else:
                     b_i_2k = num_vars + repeats * t_k + i # vars number is the existing vars + the number of variables at level k + the number of variables under node i + j
 
@@ -216,7 +133,7 @@ def gen_counting_conditions(n, grid_width, r):
                     b_r_k = num_vars + i + j # existing vars + whatever k value we're on (k is the highest node in question for all clauses)
                     clause.append(b_r_k)
 
-                if clause not in count_condition_l.clauses:
+                if clause not in count_condition_l:
                     count_condition_l.add_clause(clause)
 
         if l < num_tree_levels - 1:
@@ -236,7 +153,7 @@ def gen_counting_conditions(n, grid_width, r):
         for j in range(0, 2): #only two leaves per pre-terminal node
             for i in range(0, 2):
                 last_level_clause = list()
-                b_i_2k = -1 * (grid_vol * n + grid_vol + k * t_k + 1)
+                b_i_2k = -1 * (contact_offset + k * t_k + 1)
                 b_j_2k = b_i_2k - 1
                 b_r_k = num_vars + k * t_k + i + j
 
@@ -247,7 +164,7 @@ def gen_counting_conditions(n, grid_width, r):
 
                 if (b_i_2k < -1 * num_existing_vars or b_j_2k < -1 * num_existing_vars) and i + j == 2:
                     last_level_clause.append(-1 * b_r_k)
-                    if last_level_clause not in last_level_condition.clauses:
+                    if last_level_clause not in last_level_condition:
                         last_level_condition.add_clause(last_level_clause)
                     continue
                 elif b_i_2k < -1 * num_existing_vars and b_j_2k < -1 * num_existing_vars:
@@ -264,7 +181,7 @@ def gen_counting_conditions(n, grid_width, r):
                 if j > 0 and b_j_2k >= -1 * num_existing_vars:
                     last_level_clause.append(-1 * b_j_2k)
                 
-                if len(last_level_clause) > 0 and last_level_clause not in last_level_condition.clauses:
+                if len(last_level_clause) > 0 and last_level_clause not in last_level_condition:
                     last_level_condition.add_clause(last_level_clause)
     
     counting_conditions.append(last_level_condition)
@@ -291,30 +208,57 @@ def gen_counting_conditions(n, grid_width, r):
 
     return list([counting_conditions, num_vars])
 
+def get_contact_vars(n, grid_width, positions_of_ones, layout = "grid"):
+    # the variable before the first contact variable and the number of contact
+    # variables, for the usual layout, the contact layer in parity.py or the
+    # pruned grid in domains.py
+    grid_vol = pow(grid_width, 3)
+
+    if layout == "parity":
+        return list([grid_vol * n + 2 * grid_vol, parity.get_num_contact_vars(grid_width, 3, positions_of_ones)])
+    elif layout == "pruned":
+        return domains.Domains(n, grid_width, 3, positions_of_ones).get_contact_vars()
+
+    return list([grid_vol * n + grid_vol, 3 * grid_vol])
+
+def gen_encoded_counting_conditions(n, grid_width, r, encoding = "tree", contact_vars = None):
+    # the counting conditions with the tree above, or with one of the encodings
+    # in cardinality.py, over the contact variables from get_contact_vars
+    if contact_vars is None:
+        contact_vars = get_contact_vars(n, grid_width, list())
+
+    contact_offset, num_contact_vars = contact_vars
+
+    if encoding == "tree" and num_contact_vars >= 2 and r > 0:
+        return gen_counting_conditions(n, grid_width, r, contact_offset, num_contact_vars)
+
+    # the tree needs at least two leaves and a positive bound, and every
+    # encoding handles the bounds that leaves out the same way
+    non_contacts = [-1 * (contact_offset + c) for c in range(1, num_contact_vars + 1)]
+
+    return cardinality.gen_at_most("totalizer" if encoding == "tree" else encoding, non_contacts, r, contact_offset + num_contact_vars)
+
 def get_num_clauses(n, conditions):
     num_clauses = 0
     #n +  pow(n, 3) * (pow(n, 2) - 1)//2 +  pow(n, 3) * (n - 1)//2 + pow(n, 2) * (n - 1) + pow(n, 2) * (num_existing_ones + 1)
 
     for i in range(0, len(conditions)):
-        num_clauses += conditions[i].num_repeats * len(conditions[i].clauses)
+        num_clauses += conditions[i].num_repeats * len(conditions[i])
 
     return num_clauses
 
-def write_conditions(num_vars, num_clauses, conditions, file):
-    with open(file, "w") as f:
-        print("c " + file, file=f)
-        print("c", file=f)
-        print("p cnf " + str(num_vars) + " " + str(num_clauses), file=f)
-        for c in conditions:
-            c.write_condition(f)
+def write_conditions(num_vars, num_clauses, conditions, file, compression=None, level=None):
+    with dimacs.open_cnf(file, compression, level) as f:
+        dimacs.write_dimacs(f, file, num_vars, num_clauses, conditions)
 
-def gen_cnf_file(string, grid_width, k, embedding_conditions, contact_conditions, outfile):
+def gen_cnf_file(string, grid_width, k, embedding_conditions, contact_conditions, outfile, encoding = "tree", layout = "grid"):
+    # layout says which layout embedding_conditions and contact_conditions use
     n = len(string)
-    grid_vol = grid_width**3
     positions_of_ones = get_positions_of_ones(string)
     num_adjacent_ones = get_num_adjacent_ones(positions_of_ones)
-    r = 3 * grid_vol - (num_adjacent_ones + k)
-    counting_conditions_num_vars = gen_counting_conditions(n, grid_width, r)
+    contact_vars = get_contact_vars(n, grid_width, positions_of_ones, layout)
+    r = contact_vars[1] - (num_adjacent_ones + k)
+    counting_conditions_num_vars = gen_encoded_counting_conditions(n, grid_width, r, encoding, contact_vars)
     counting_conditions = counting_conditions_num_vars[0]
     num_vars = counting_conditions_num_vars[1]
     conditions = embedding_conditions + contact_conditions + counting_conditions
@@ -322,14 +266,39 @@ def gen_cnf_file(string, grid_width, k, embedding_conditions, contact_conditions
     write_conditions(num_vars, num_clauses, conditions, outfile)
 
 def main(argv):
+    # -b anywhere on the command line adds the symmetry breaking clauses
+    symmetry_breaking = "-b" in argv
+    argv = [arg for arg in argv if arg != "-b"]
+
+    # --parity uses the contact variables from parity.py, and --prune the
+    # pruned grid from domains.py
+    layout = "grid"
+
+    for option, option_layout in [("--parity", "parity"), ("--prune", "pruned")]:
+        if option in argv:
+            layout = option_layout
+            argv = [arg for arg in argv if arg != option]
+
+    # -e {encoding} picks the encoding of the counting conditions
+    encoding = "tree"
+
+    if "-e" in argv:
+        i = argv.index("-e")
+        encoding = argv[i + 1]
+        argv = argv[:i] + argv[i + 2:]
+
     if len(argv) <= 3 or len(argv) > 4:
-        print("ERROR: wrong number of arguments given\n\tUsage: main.py {input file} {goal number of contacts} {optional output directory}")
+        print("ERROR: wrong number of arguments given\n\tUsage: main.py {input file} {goal number of contacts} {optional output directory} {optional -b for symmetry breaking} {optional --parity for the parity aware contact variables or --prune for the pruned grid} {optional -e and a counting encoding: tree, sequential, totalizer, modulo or network}")
         return
     elif len(argv) == 4:
         outdir = argv[3]
     else:
         outdir = "."
 
+    if encoding != "tree" and encoding not in cardinality.ENCODINGS:
+        print("ERROR: unknown counting encoding", encoding + ", expected tree or one of", ", ".join(cardinality.ENCODINGS))
+        return 1
+
     file_name = argv[1]
 
     string = read_data("./input/" + file_name)
@@ -349,13 +318,31 @@ def main(argv):
     positions_of_ones = get_positions_of_ones(string)
     num_adjacent_ones = get_num_adjacent_ones(positions_of_ones)
     k = int(argv[2]) # start by looking for only one contact
-    r = 3 * (grid_width ** 3) - (num_adjacent_ones + k)
-    embedding_conditions = gen_embedding_conditions(n, grid_width)
-    contact_conditions = gen_contact_conditions(n, grid_width, positions_of_ones)
-    counting_conditions_num_vars = gen_counting_conditions(n, grid_width, r)
+    contact_vars = get_contact_vars(n, grid_width, positions_of_ones, layout)
+    r = contact_vars[1] - (num_adjacent_ones + k)
+
+    if layout == "pruned":
+        pruned_grid = domains.Domains(n, grid_width, 3, positions_of_ones)
+        embedding_conditions = pruned_grid.gen_embedding_conditions()
+        contact_conditions = pruned_grid.gen_contact_conditions()
+    else:
+        embedding_conditions = gen_embedding_conditions(n, grid_width)
+
+        if layout == "parity":
+            contact_conditions = parity.gen_parity_contact_conditions(n, grid_width, 3, positions_of_ones)
+        else:
+            contact_conditions = gen_contact_conditions(n, grid_width, positions_of_ones)
+
+    counting_conditions_num_vars = gen_encoded_counting_conditions(n, grid_width, r, encoding, contact_vars)
     counting_conditions = counting_conditions_num_vars[0]
     num_vars = counting_conditions_num_vars[1]
     conditions = embedding_conditions + contact_conditions + counting_conditions
+
+    if symmetry_breaking and layout == "pruned":
+        conditions += pruned_grid.gen_symmetry_conditions()
+    elif symmetry_breaking:
+        conditions += symmetry.gen_symmetry_conditions(n, grid_width, 3)
+
     num_clauses = get_num_clauses(n, conditions)
     print("string:", string)
     print("length:", n)
@@ -367,5 +354,6 @@ def main(argv):
 
     return 0
 
-main(sys.argv)
+if __name__ == "__main__":
+    main(sys.argv)
 #main(["HPsat-3D.py", "1f8vF0", "10", "./test_output"])
\ No newline at end of file
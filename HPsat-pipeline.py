@@ -3,12 +3,55 @@
 # Given a list of input files, generates the .cnf and .ilp files and reports the 
 # time taken by both Gurobi and pLingeling to maximize the number of contacts.
 
+import os
 import sys
 import math
 import subprocess
-import re
 import time
+import io
+import shutil
+import tempfile
+import shlex
 from Condition import Condition
+import dimacs
+import solvers
+import incremental
+import speculative
+import batch
+import symmetry
+import cardinality
+import parity
+import lattice
+import domains
+import bounds
+import folding
+import models
+import results
+import cnfcache
+import ilp
+import hpb
+
+SAT_SOLVER = ["./glucose-syrup/parallel/glucose-syrup"]
+
+def get_sat_solver(options):
+    # the solver command, limited to options["threads"] threads if that's set,
+    # and printing the model if the pipeline decodes it
+    command = list(SAT_SOLVER)
+
+    if options["threads"] is not None:
+        command.append("-nthreads=" + str(options["threads"]))
+
+    if options["model"]:
+        command.append("-model")
+
+    return command
+
+def get_portfolio(options):
+    # the solver commands given with --solver, or the default solver
+    if len(options["solvers"]) == 0:
+        return [get_sat_solver(options)]
+
+    return options["solvers"]
 
 def read_data(file):
     with open(file) as f:
@@ -45,7 +88,7 @@ def repeat_count_condition(count_condition, t_ki, t_k, repeats):
     clauses = list(count_condition.clauses)
 
     for i in range(1, repeats):
-        for c in count_condition.clauses:
+        for c in count_condition:
             new_clause = list()
             last_el = c[len(c) - 1]
 
@@ -68,121 +111,25 @@ def repeat_count_condition(count_condition, t_ki, t_k, repeats):
     count_condition.set_clauses(clauses)
 
 def gen_embedding_conditions(n, grid_width):
-    embedding_conditions = list()
-    grid_size = pow(grid_width, 2)
-
-    # embedding condition 1 (every x_ij is somewhere)
-    embed_condition_1 = Condition([range(1, grid_size + 1)], True, n, grid_size)
-    embedding_conditions.append(embed_condition_1)
-
-    # embedding condition 2 (every x_ij can only be true for one j)
-    embed_condition_2 = Condition(list(), True, n, grid_size)
-
-    for i in range(1, grid_size ):
-        for j in range (i + 1, grid_size + 1):
-            embed_condition_2.add_clause([-1 * i,-1 * j])
-    
-    embedding_conditions.append(embed_condition_2)
-
-    # embedding condition 3 (every x_ij can only be true for one i)
-    embed_condition_3 = Condition(list(), True, grid_size, 1)
-
-    stop = (n - 1) * grid_size + 1
-
-    for j in range(1, stop, grid_size ):
-        for i in range(j+grid_size , stop+1, grid_size ):
-            embed_condition_3.add_clause([-1 * j, -1 * i])
-    
-    embedding_conditions.append(embed_condition_3)
-
-    # embedding condition 4
-    embed_condition_4 = Condition(list(), True, n - 1, grid_size)
-
-    for i in range(1, grid_size + 1):
-        if i == 1:
-            # condition 4f
-            embed_condition_4.add_clause([-1 * i, i + grid_size + 1, i + grid_size + grid_width])
-        elif i == grid_width:
-            # conditin 4g
-            embed_condition_4.add_clause([-1 * i, i + grid_size - 1, i + grid_size + grid_width])
-        elif i == grid_size - grid_width + 1:
-            # condition 4h
-            embed_condition_4.add_clause([-1 * i, i + grid_size + 1, i + grid_size - grid_width])
-        elif i == grid_size:
-            # condition 4i
-            embed_condition_4.add_clause([-1 * i, i + grid_size - 1, i + grid_size - grid_width])
-        elif i % grid_width == 1:
-            # condition 4d
-            embed_condition_4.add_clause([-1 * i, i + grid_size + 1, i + grid_size + grid_width, i + grid_size - grid_width])
-        elif i % grid_width == 0:
-            # condition 4e
-            embed_condition_4.add_clause([-1 * i, i + grid_size - 1, i + grid_size + grid_width, i + grid_size - grid_width])
-        elif i > 1 and i < grid_width:
-            # condition 4b
-            embed_condition_4.add_clause([-1 * i, i + grid_size + 1, i + grid_size - 1, i + grid_size + grid_width])
-        elif i > (grid_size - grid_width + 1) and i < grid_size:
-            # condition 4c
-            embed_condition_4.add_clause([-1 * i, i + grid_size + 1, i + grid_size - 1, i + grid_size - grid_width])
-        else:
-            embed_condition_4.add_clause([-1 * i, i + grid_size + 1, i + grid_size - 1, i + grid_size + grid_width, i + grid_size - grid_width])
-
-    embedding_conditions.append(embed_condition_4)
-
-    return embedding_conditions
+    return lattice.gen_embedding_conditions(n, grid_width, 2)
 
 def gen_contact_conditions(n, grid_width, positions_of_ones):
-    grid_size = pow(grid_width, 2)
-    offset = grid_size * n #existing vars from X_ij conditions
-    contact_conditions = list()
-    
-    # contact condition 1
-    contact_condition_1 = Condition(list(), True, grid_size, 1)
-
-    for x in positions_of_ones:
-        contact_condition_1.add_clause([offset + 1, (-1 * x * grid_size) - 1])
-
-    last_clause = [(-1 * offset) - 1]
-    last_clause.extend(map(lambda x: (x * grid_size) + 1, positions_of_ones))
-    contact_condition_1.add_clause(last_clause)
-
-    contact_conditions.append(contact_condition_1)
-
-    # contact condition 2
-    clauses = list()
-
-    for j in range(1, grid_size + 1):
-        C_jr = offset + grid_size + j
-        C_jd = C_jr + grid_size 
-        T_j = C_jr - grid_size 
-        T_jr = T_j + 1
-        T_jd = T_j + grid_width
-
-        if j == grid_size:
-            clauses.extend([[-1 * C_jr]])
-            clauses.extend([[-1 * C_jd]])
-        elif j >= grid_size - grid_width + 1:
-            clauses.extend([[-1 * C_jr, T_j], [-1 * C_jr, T_jr], [C_jr, -1 * T_j, -1 * T_jr]])
-            clauses.extend([[-1 * C_jd]])
-        elif j % grid_width == 0:
-            clauses.extend([[-1 * C_jr]])
-            clauses.extend([[-1 * C_jd, T_j], [-1 * C_jd, T_jd], [C_jd, -1 * T_j, -1 * T_jd]]) 
-        else:
-            clauses.extend([[-1 * C_jr, T_j], [-1 * C_jr, T_jr], [C_jr, -1 * T_j, -1 * T_jr]])
-            clauses.extend([[-1 * C_jd, T_j], [-1 * C_jd, T_jd], [C_jd, -1 * T_j, -1 * T_jd]])
-
-    contact_condition_2 = Condition(clauses)
-    contact_conditions.append(contact_condition_2)
-
-    return contact_conditions
+    return lattice.gen_contact_conditions(n, grid_width, 2, positions_of_ones)
 
-def gen_counting_conditions(n, grid_width, r):
+def gen_counting_conditions(n, grid_width, r, contact_offset = None, num_contact_condition_vars = None):
     # counting conditions 1 and 2
     # make one condition per level w/ appropriate # of repeats
+    # the leaves are the num_contact_condition_vars variables after contact_offset,
+    # the usual contact variables unless they're given
     grid_size = pow(grid_width, 2)
-    num_contact_condition_vars = 2 * grid_size 
+
+    if contact_offset is None:
+        contact_offset = grid_size * n + grid_size
+        num_contact_condition_vars = 2 * grid_size
+
     num_tree_levels = math.ceil(math.log(num_contact_condition_vars, 2))
     counting_conditions = list()
-    num_existing_vars = grid_size * n + grid_size + num_contact_condition_vars
+    num_existing_vars = contact_offset + num_contact_condition_vars
     num_vars = num_existing_vars
 
     for l in range(1, num_tree_levels - 1):
@@ -198,7 +145,7 @@ def gen_counting_conditions(n, grid_width, r):
         # i and j are the two children of node k.
         for j in range(0, t_ki + 1):
             if l == num_tree_levels - 1:
-                b_j_2k =  -1 * (grid_size * n + grid_size + t_ki + j)
+                b_j_2k =  -1 * (contact_offset + t_ki + j)
             else:
                 b_j_2k = num_vars + repeats * t_k + t_ki + j # var number will be the existing number of variables + the number of variables at level k + i
 
@@ -211,7 +158,7 @@ def gen_counting_conditions(n, grid_width, r):
                     continue
 
                 if l == num_tree_levels - 1:
-                    b_i_2k = -1 * (grid_size * n + grid_size + i)
+                    b_i_2k = -1 * (contact_offset + i)
                 else:
                     b_i_2k = num_vars + repeats * t_k + i # vars number is the existing vars + the number of variables at level k + the number of variables under node i + j
 
@@ -224,7 +171,7 @@ def gen_counting_conditions(n, grid_width, r):
                     b_r_k = num_vars + i + j # existing vars + whatever k value we're on (k is the highest node in question for all clauses)
                     clause.append(b_r_k)
 
-                if clause not in count_condition_l.clauses:
+                if clause not in count_condition_l:
                     count_condition_l.add_clause(clause)
 
         if l < num_tree_levels - 1:
@@ -244,7 +191,7 @@ def gen_counting_conditions(n, grid_width, r):
         for j in range(0, 2): #only two leaves per pre-terminal node
             for i in range(0, 2):
                 last_level_clause = list()
-                b_i_2k = -1 * (grid_size * n + grid_size + k * t_k + 1)
+                b_i_2k = -1 * (contact_offset + k * t_k + 1)
                 b_j_2k = b_i_2k - 1
                 b_r_k = num_vars + k * t_k + i + j
 
@@ -263,7 +210,7 @@ def gen_counting_conditions(n, grid_width, r):
                 else:
                     last_level_clause.append(b_r_k)
                 
-                if len(last_level_clause) > 0 and last_level_clause not in last_level_condition.clauses:
+                if len(last_level_clause) > 0 and last_level_clause not in last_level_condition:
                     last_level_condition.add_clause(last_level_clause)
     
     counting_conditions.append(last_level_condition)
@@ -290,37 +237,228 @@ def gen_counting_conditions(n, grid_width, r):
 
     return list([counting_conditions, num_vars])
 
+def get_contact_vars(n, grid_width, positions_of_ones, layout = "grid"):
+    # the variable before the first contact variable and the number of contact
+    # variables, for the usual layout, the contact layer in parity.py or the
+    # pruned grid in domains.py
+    grid_size = pow(grid_width, 2)
+
+    if layout == "parity":
+        return list([grid_size * n + 2 * grid_size, parity.get_num_contact_vars(grid_width, 2, positions_of_ones)])
+    elif layout == "pruned":
+        return domains.Domains(n, grid_width, 2, positions_of_ones).get_contact_vars()
+
+    return list([grid_size * n + grid_size, 2 * grid_size])
+
+def gen_encoded_counting_conditions(n, grid_width, r, encoding = "tree", contact_vars = None):
+    # the counting conditions with the tree above, or with one of the encodings
+    # in cardinality.py, over the contact variables from get_contact_vars
+    if contact_vars is None:
+        contact_vars = get_contact_vars(n, grid_width, list())
+
+    contact_offset, num_contact_vars = contact_vars
+
+    if encoding == "tree" and num_contact_vars >= 2 and r > 0:
+        return gen_counting_conditions(n, grid_width, r, contact_offset, num_contact_vars)
+
+    # the tree needs at least two leaves and a positive bound, and every
+    # encoding handles the bounds that leaves out the same way
+    non_contacts = [-1 * (contact_offset + c) for c in range(1, num_contact_vars + 1)]
+
+    return cardinality.gen_at_most("totalizer" if encoding == "tree" else encoding, non_contacts, r, contact_offset + num_contact_vars)
+
 def get_num_clauses(n, conditions):
     num_clauses = 0
     #n +  pow(n, 3) * (pow(n, 2) - 1)//2 +  pow(n, 3) * (n - 1)//2 + pow(n, 2) * (n - 1) + pow(n, 2) * (num_existing_ones + 1)
 
     for i in range(0, len(conditions)):
-        num_clauses += conditions[i].num_repeats * len(conditions[i].clauses)
+        num_clauses += conditions[i].num_repeats * len(conditions[i])
 
     return num_clauses
 
-def write_conditions(num_vars, num_clauses, conditions, file):
-    with open(file, "w") as f:
-        print("c " + file, file=f)
-        print("c", file=f)
-        print("p cnf " + str(num_vars) + " " + str(num_clauses), file=f)
-        for c in conditions:
-            c.write_condition(f)
-
-def gen_cnf_file(string, grid_width, k, embedding_conditions, contact_conditions, outfile):
+def gen_cnf(string, grid_width, k, prefix, encoding = "tree", layout = "grid"):
     n = len(string)
-    grid_size = pow(grid_width, 2)
     positions_of_ones = get_positions_of_ones(string)
     num_adjacent_ones = get_num_adjacent_ones(positions_of_ones)
-    r = 2 * grid_size - (num_adjacent_ones + k)
-    counting_conditions_num_vars = gen_counting_conditions(n, grid_width, r)
+    contact_vars = get_contact_vars(n, grid_width, positions_of_ones, layout)
+    r = contact_vars[1] - (num_adjacent_ones + k)
+    counting_conditions_num_vars = gen_encoded_counting_conditions(n, grid_width, r, encoding, contact_vars)
     counting_conditions = counting_conditions_num_vars[0]
     num_vars = counting_conditions_num_vars[1]
-    conditions = embedding_conditions + contact_conditions + counting_conditions
-    num_clauses = get_num_clauses(n, conditions)
-    write_conditions(num_vars, num_clauses, conditions, outfile)
+    num_clauses = prefix.num_clauses + get_num_clauses(n, counting_conditions)
+
+    return list([num_vars, num_clauses, counting_conditions])
+
+def gen_cnf_file(string, grid_width, k, prefix, outfile, encoding = "tree", layout = "grid"):
+    # only the counting conditions depend on k, the rest of the file is copied
+    # from the prefix segment written for the first k
+    num_vars, num_clauses, counting_conditions = gen_cnf(string, grid_width, k, prefix, encoding, layout)
+    prefix.write_file(outfile, num_vars, num_clauses, counting_conditions)
+
+def write_cnf_file(string, grid_width, k, prefix, outfile, options):
+    # write the cnf file for k, or take it from the cache of cnf files if it's
+    # there and add it to the cache if it isn't
+    if options["cache"] is None:
+        gen_cnf_file(string, grid_width, k, prefix, outfile, options["encoding"], options["layout"])
+        return
+
+    key = cnfcache.get_key([2, string, grid_width, k, options["encoding"], options["layout"], options["symmetry"], options["compression"], options["level"]])
+
+    if cnfcache.fetch(options["cache"], key, outfile):
+        print("Found the file for k =", k, "in the cache")
+        return
+
+    cnfcache.release(outfile)
+    gen_cnf_file(string, grid_width, k, prefix, outfile, options["encoding"], options["layout"])
+    cnfcache.store(options["cache"], key, outfile, options["cache_size"] * 1024 * 1024)
+
+def gen_incremental_formula(string, grid_width, prefix_conditions, solver_name, layout = "grid"):
+    # build the counting tree once for k = 0, the most non-contacts any k allows,
+    # and leave the bound on its root to the assumptions made for each k
+    n = len(string)
+    positions_of_ones = get_positions_of_ones(string)
+    num_adjacent_ones = get_num_adjacent_ones(positions_of_ones)
+    contact_offset, num_contact_condition_vars = get_contact_vars(n, grid_width, positions_of_ones, layout)
+    num_existing_vars = contact_offset + num_contact_condition_vars
+
+    if num_contact_condition_vars < 2:
+        # no contacts are possible, so every k is UNSAT without a tree
+        return incremental.IncrementalFormula(prefix_conditions, num_existing_vars, num_existing_vars, 0, solver_name)
+
+    num_tree_levels = math.ceil(math.log(num_contact_condition_vars, 2))
+    r = num_contact_condition_vars - num_adjacent_ones
+    counting_conditions, num_vars = gen_counting_conditions(n, grid_width, r, contact_offset, num_contact_condition_vars)
+    root_width = min(r, pow(2, num_tree_levels - 1))
+
+    # the last counting condition bounds the root by r, which the assumptions replace
+    return incremental.IncrementalFormula(prefix_conditions + counting_conditions[:-1], num_vars, num_existing_vars, root_width, solver_name)
+
+def solve_for_k(string, grid_width, k, prefix, outfile, time_elapsed, options):
+    # generate the cnf file for k and run glucose-syrup on it, or stream the formula
+    # straight into glucose-syrup's stdin while it is generated if the pipe option is set
+    solver = get_portfolio(options)[0]
+
+    if options["results"] is not None:
+        stored = results.lookup(options["results"], get_results_key(string, grid_width, options), k)
+
+        if stored is not None:
+            # answered by an earlier run, with the true literals of the model
+            # on a "v" line if it was SAT and the solver printed one
+            print("Answer for k =", k, "read from", options["results"])
+            time_elapsed[4] += 1
+
+            return subprocess.CompletedProcess([stored[1]], stored[0], "" if stored[2] is None else "v " + stored[2] + " 0", None)
+
+    if options["incremental"] is not None:
+        # prefix is the IncrementalFormula for the string, already holding every clause
+        positions_of_ones = get_positions_of_ones(string)
+        num_contact_vars = get_contact_vars(len(string), grid_width, positions_of_ones, options["layout"])[1]
+        r = num_contact_vars - (get_num_adjacent_ones(positions_of_ones) + k)
+        print("Solving for k =", k, "with", options["incremental"])
+        start = time.time()
+        result = prefix.solve(r)
+        end = time.time()
+        time_elapsed[0] += end - start
+        time_elapsed[1] += 1
+        record_result(string, grid_width, k, result, options["incremental"], end - start, prefix, options)
+
+        return result
+
+    print("Generating file with k =", k)
+
+    if options["pipe"]:
+        num_vars, num_clauses, counting_conditions = gen_cnf(string, grid_width, k, prefix, options["encoding"], options["layout"])
+        write_cnf = lambda f: prefix.write_stream(f, outfile, num_vars, num_clauses, counting_conditions)
+        print("Calling glucose-syrup")
+        start = time.time()
+        result = solvers.run_solver(solver, write_cnf=write_cnf, capture_output=options["model"])
+    else:
+        write_cnf_file(string, grid_width, k, prefix, outfile, options)
+
+        if options["race"]:
+            # race every solver on the file within the time and memory limits,
+            # and count which one answered first
+            portfolio = get_portfolio(options)
+            print("Racing", ", ".join(command[0] for command in portfolio))
+            start = time.time()
+            result = solvers.race(portfolio, outfile, options["timeout"], options["memory"])
+
+            if result.returncode == 10 or result.returncode == 20:
+                winner = " ".join(result.args[:-1])
+                time_elapsed[2][winner] = time_elapsed[2].get(winner, 0) + 1
+                solver = result.args[:-1]
+        else:
+            print("Calling glucose-syrup")
+            start = time.time()
+            result = solvers.run_solver(solver, outfile, capture_output=options["model"])
+
+    end = time.time()
+    time_elapsed[0] += end - start
+    time_elapsed[1] += 1
+    record_result(string, grid_width, k, result, " ".join(solver), end - start, prefix, options)
+
+    return result
+
+def get_results_key(string, grid_width, options):
+    # the key of the probes for string on a grid in the results store
+    return (string, 2, grid_width, options["layout"], options["encoding"])
+
+def record_result(string, grid_width, k, result, solver_name, time_taken, prefix, options):
+    # store a SAT or UNSAT answer in the results store, if there is one
+    if options["results"] is None or (result.returncode != 10 and result.returncode != 20):
+        return
+
+    model = None
+
+    if result.returncode == 10:
+        if options["incremental"] is not None:
+            model = prefix.get_model()
+        elif result.stdout is not None:
+            model = models.parse_model(result.stdout)
+
+    results.record(options["results"], get_results_key(string, grid_width, options), k, result.returncode, solver_name, time_taken, model)
+
+def decode_contacts(string, grid_width, k, result, prefix, time_elapsed, options):
+    # the contacts of the fold in the model of a SAT run for k, which are at
+    # least k, keeping the fold with the most contacts so far in time_elapsed
+    if options["incremental"] is not None and result.stdout is None:
+        model = prefix.get_model()
+    else:
+        model = models.parse_model(result.stdout)
+
+    fold = models.decode_fold(string, grid_width, 2, model, options["layout"])
+
+    if fold is None:
+        print("No fold found in the model for k =", k)
+        return k
+
+    contacts = folding.count_contacts(fold, string)
+    print("The model for k =", k, "has", contacts, "contacts")
+
+    if time_elapsed[3] is None or contacts > time_elapsed[3][1]:
+        time_elapsed[3] = (fold, contacts)
+
+    return max(k, contacts)
+
+def get_largest_sat(k_vals_tried):
+    # the largest k known to be SAT, or 0
+    return max([0] + [k for k in k_vals_tried if k_vals_tried[k]])
+
+def get_stop_reason(k, result):
+    # why the run for k gave no answer, for the output file
+    stderr = result.stderr
+
+    if isinstance(stderr, bytes):
+        stderr = stderr.decode(errors="replace")
+
+    lines = (stderr or "").strip().splitlines()
+
+    return "no answer for k = " + str(k) + ": " + (lines[-1] if len(lines) > 0 else "return code " + str(result.returncode))
+
+def bin_search(string, grid_width, min_k, max_k, prefix, outfile, time_elapsed, options, k_vals_tried = None):
+    if k_vals_tried is None:
+        k_vals_tried = dict()
 
-def bin_search(string, grid_width, min_k, max_k, embedding_conditions, contact_conditions, outfile, time_elapsed, k_vals_tried = dict()):
     k = math.ceil((min_k + max_k) / 2)
 
 
@@ -331,132 +469,588 @@ def bin_search(string, grid_width, min_k, max_k, embedding_conditions, contact_c
         if k_vals_tried[k]:
             if min_k == max_k:
                 return k
-            return bin_search(string, grid_width, k, max_k, embedding_conditions, contact_conditions, outfile, time_elapsed, k_vals_tried)
+            return bin_search(string, grid_width, k, max_k, prefix, outfile, time_elapsed, options, k_vals_tried)
         else:
-            return bin_search(string, grid_width, min_k, k - 1, embedding_conditions, contact_conditions, outfile, time_elapsed, k_vals_tried)
+            return bin_search(string, grid_width, min_k, k - 1, prefix, outfile, time_elapsed, options, k_vals_tried)
 
     else:
-        print("Generating file with k =", k)
-        gen_cnf_file(string, grid_width, k, embedding_conditions, contact_conditions, outfile)
-        print("Calling glucose-syrup")
-        start = time.time()
-        result = subprocess.run(["./glucose-syrup/parallel/glucose-syrup", outfile])
-        end = time.time()
-        time_elapsed[0] += end - start
-        time_elapsed[1] += 1 #another try
+        result = solve_for_k(string, grid_width, k, prefix, outfile, time_elapsed, options)
 
         if result.returncode < 10:
+            # a run that timed out or failed ends the search, with the largest k
+            # known to be SAT as a lower bound
             print(result.stderr)
-            return 0
+            time_elapsed[5] = get_stop_reason(k, result)
+            return get_largest_sat(k_vals_tried)
         elif result.returncode == 10:
+            if options["model"]:
+                # every k up to the contacts in the model is SAT
+                contacts = decode_contacts(string, grid_width, k, result, prefix, time_elapsed, options)
+
+                for j in range(k, contacts + 1):
+                    k_vals_tried[j] = True
+
+                return bin_search(string, grid_width, min(contacts, max_k), max_k, prefix, outfile, time_elapsed, options, k_vals_tried)
+
             if (min_k == max_k):
                 return k
             k_vals_tried[k] = True
-            return bin_search(string, grid_width, k, max_k, embedding_conditions, contact_conditions, outfile, time_elapsed, k_vals_tried)
+            return bin_search(string, grid_width, k, max_k, prefix, outfile, time_elapsed, options, k_vals_tried)
         elif result.returncode == 20:
             k_vals_tried[k] = False
-            return bin_search(string, grid_width, min_k, k-1, embedding_conditions, contact_conditions, outfile, time_elapsed, k_vals_tried)
+            return bin_search(string, grid_width, min_k, k-1, prefix, outfile, time_elapsed, options, k_vals_tried)
         else:
             print("I found a bug! Unaccounted for return code: " + result.returncode)
     
-def maximize_contacts(string, grid_width, k, embedding_conditions, contact_conditions, outfile, time_elapsed, k_vals_tried=dict()):
+def maximize_contacts(string, grid_width, k, prefix, outfile, time_elapsed, options, k_vals_tried = None):
+    if k_vals_tried is None:
+        k_vals_tried = dict()
+
     if k == 0:
         return 0
 
-    print("Generating file with k =", k)
-    gen_cnf_file(string, grid_width, k, embedding_conditions, contact_conditions, outfile)
-    print("Calling glucose-syrup")
-    start = time.time()
-    result = subprocess.run(["./glucose-syrup/parallel/glucose-syrup", outfile])
-    end = time.time()
-    time_elapsed[0] += end - start
-    time_elapsed[1] += 1
+    if options["bound"]:
+        bound = bounds.get_contact_bound(string, 2)
+
+        # every k above the bound is UNSAT, so the search stays below it and a
+        # SAT answer at the bound ends it without another run
+        if k > bound:
+            return bin_search(string, grid_width, k // 2, bound, prefix, outfile, time_elapsed, options, k_vals_tried)
+
+    result = solve_for_k(string, grid_width, k, prefix, outfile, time_elapsed, options)
 
     if result.returncode < 10:
         print(result.stderr)
-        return
+        time_elapsed[5] = get_stop_reason(k, result)
+        return get_largest_sat(k_vals_tried)
     elif result.returncode == 10:
         k_vals_tried[k] = True
-        return maximize_contacts(string, grid_width, 2 * k, embedding_conditions, contact_conditions, outfile, time_elapsed, k_vals_tried)
+
+        if options["model"]:
+            # every k up to the contacts in the model is SAT, so the search
+            # goes on one above them
+            contacts = decode_contacts(string, grid_width, k, result, prefix, time_elapsed, options)
+
+            for j in range(k, contacts + 1):
+                k_vals_tried[j] = True
+
+            return maximize_contacts(string, grid_width, contacts + 1, prefix, outfile, time_elapsed, options, k_vals_tried)
+
+        return maximize_contacts(string, grid_width, 2 * k, prefix, outfile, time_elapsed, options, k_vals_tried)
     elif result.returncode == 20:
         k_vals_tried[k] = False
-        return bin_search(string, grid_width, k // 2, k-1, embedding_conditions, contact_conditions, outfile, time_elapsed, k_vals_tried)
+        return bin_search(string, grid_width, k // 2, k-1, prefix, outfile, time_elapsed, options, k_vals_tried)
     else:
         print("I found a bug! Unaccounted for return code: " + result.returncode)
 
-def maximize_with_gurobi(file, time_elapsed, n):
+def count_search_runs(max_contacts, k, k_vals_tried, bound = None):
+    # the number of solver runs maximize_contacts makes starting from k when
+    # max_contacts is the answer and the k in k_vals_tried are already known
+    k_vals_tried = dict(k_vals_tried)
+    runs = 0
+
+    if k == 0:
+        return 0
+
+    while True:
+        if bound is not None and k > bound:
+            min_k, max_k = k // 2, bound
+            break
+
+        runs += 1
+
+        if k > max_contacts:
+            k_vals_tried[k] = False
+            min_k, max_k = k // 2, k - 1
+            break
+
+        k_vals_tried[k] = True
+        k *= 2
+
+    while True:
+        k = math.ceil((min_k + max_k) / 2)
+
+        if k == 0:
+            return runs
+
+        if k not in k_vals_tried:
+            runs += 1
+            k_vals_tried[k] = k <= max_contacts
+
+        if k_vals_tried[k]:
+            if min_k == max_k:
+                return runs
+            min_k = k
+        else:
+            max_k = k - 1
+
+def maximize_with_ilp(file, string, time_elapsed, options, fold = None):
+    # write the ILP for string and solve it with the ILP solver in options,
+    # returning the most contacts found, or None if the solver failed. fold, a
+    # fold and its contacts, is the start of the solve if it fits in the grid
+    # of the ILP.
     sol_file = "./gurobi_output/" + file + ".sol"
-    lp_file = "./input/" + file + ".lp"
+    lp_file = options["lp_dir"] + "/" + file + ".lp"
+    formulation = hpb.get_formulation(len(string))
+    start = None
+    cutoff = None
 
-    if (n >= 12):
-        subprocess.run(["perl", "./HPb1.pl", "./input/" + file])
-    else:
-        subprocess.run(["perl", "./HPb.pl", "./input/" + file])
+    os.makedirs(options["lp_dir"], exist_ok=True)
+    hpb.write_lp_file(string, lp_file, formulation)
 
-    start = time.time()
-    result = subprocess.run(["gurobi_cl", "ResultFile=" + sol_file, lp_file], capture_output=True)
-    end = time.time()
+    if fold is not None:
+        grid_width = hpb.get_grid_width(len(string), formulation)
+        start = models.get_ilp_start(string, fold[0], grid_width, 2, "A" if formulation == "HPb" else "X")
+
+    # the contacts of the fold are reachable, so the solver only has to look
+    # for more
+    if start is not None:
+        cutoff = fold[1] - 0.5
+        time_elapsed[1] = fold[1]
 
-    if (result.returncode == 1):
+    result, objective, values, time_taken = ilp.solve(options["ilp"], lp_file, sol_file, options["threads"], options["ilp_timeout"], start, cutoff)
+
+    if (result.returncode != 0):
         print(str(result.stdout))
         return
+
+    time_elapsed[0] = time_taken
+
+    if objective is None:
+        return 0
+
+    # the number of contacts is never negative, and like the old parsing of
+    # the Gurobi solution this doesn't depend on the sign a solver writes
+    return int(round(abs(objective)))
+
+def parse_args(argv):
+    # split the command line into the input files, the output directory and the
+    # options controlling how the cnf files are generated and solved
+    files = list()
+    outdir = "./output"
+    options = {"compression": None, "level": None, "pipe": False, "incremental": None, "speculative": None, "jobs": None, "threads": None, "solvers": list(), "timeout": None, "memory": None, "race": False, "symmetry": False, "grow": False, "max_width": None, "encoding": "tree", "layout": "grid", "bound": False, "fold": False, "model": False, "results": None, "cache": None, "cache_size": 4096, "ilp": None, "ilp_timeout": None, "warm_start": False, "lp_dir": "./input"}
+    i = 1
+
+    while i < len(argv):
+        if argv[i] == "-o":
+            outdir = argv[i + 1]
+            i += 2
+        elif argv[i] == "-z":
+            options["compression"] = argv[i + 1]
+            i += 2
+        elif argv[i] == "-l":
+            options["level"] = int(argv[i + 1])
+            i += 2
+        elif argv[i] == "-p":
+            options["pipe"] = True
+            i += 1
+        elif argv[i] == "-b":
+            options["symmetry"] = True
+            i += 1
+        elif argv[i] == "--parity" or argv[i] == "--prune":
+            if options["layout"] != "grid":
+                raise Exception("ERROR: --parity and --prune can't be combined")
+
+            options["layout"] = "parity" if argv[i] == "--parity" else "pruned"
+            i += 1
+        elif argv[i] == "-e":
+            options["encoding"] = argv[i + 1]
+            i += 2
+        elif argv[i] == "--ilp":
+            options["ilp"] = argv[i + 1]
+            i += 2
+        elif argv[i] == "--ilp-timeout":
+            options["ilp_timeout"] = float(argv[i + 1])
+            i += 2
+        elif argv[i] == "--warm-start":
+            options["warm_start"] = True
+            options["model"] = True # the start is the best fold in the models
+            i += 1
+        elif argv[i] == "--lp-dir":
+            options["lp_dir"] = argv[i + 1]
+            i += 2
+        elif argv[i] == "--cache":
+            options["cache"] = argv[i + 1]
+            i += 2
+        elif argv[i] == "--cache-size":
+            options["cache_size"] = int(argv[i + 1])
+            i += 2
+        elif argv[i] == "--results":
+            options["results"] = argv[i + 1]
+            i += 2
+        elif argv[i] == "-m":
+            options["model"] = True
+            i += 1
+        elif argv[i] == "-f":
+            options["fold"] = True
+            i += 1
+        elif argv[i] == "-u":
+            options["bound"] = True
+            i += 1
+        elif argv[i] == "-g":
+            options["grow"] = True
+            options["model"] = True # the grid stops growing once the best fold in the models has room
+            i += 1
+        elif argv[i] == "--max-width":
+            options["max_width"] = int(argv[i + 1])
+            i += 2
+        elif argv[i] == "-i":
+            options["incremental"] = argv[i + 1]
+            i += 2
+        elif argv[i] == "-s":
+            options["speculative"] = int(argv[i + 1])
+            i += 2
+        elif argv[i] == "--jobs":
+            options["jobs"] = int(argv[i + 1])
+            i += 2
+        elif argv[i] == "--threads":
+            options["threads"] = int(argv[i + 1])
+            i += 2
+        elif argv[i] == "--solver":
+            options["solvers"].append(shlex.split(argv[i + 1]))
+            i += 2
+        elif argv[i] == "--timeout":
+            options["timeout"] = float(argv[i + 1])
+            i += 2
+        elif argv[i] == "--memory":
+            options["memory"] = int(argv[i + 1])
+            i += 2
+        else:
+            files.append(argv[i])
+            i += 1
+
+    dimacs.check_compression(options["compression"], options["level"])
+
+    if options["level"] is not None and options["compression"] is None:
+        raise Exception("ERROR: -l sets the compression level of -z and can't be used without it")
+
+    # the default solver reads plain and gzip files only
+    if options["compression"] == "xz" and len(options["solvers"]) == 0:
+        raise Exception("ERROR: glucose-syrup can't read .xz files, use -z gz or a --solver that reads them")
+
+    # a portfolio of solvers, or limits on the solver, need every run to read a
+    # file of its own so it can be raced and killed
+    options["race"] = len(options["solvers"]) > 1 or options["timeout"] is not None or options["memory"] is not None
+
+    if options["ilp"] is not None:
+        ilp.check_solver(options["ilp"])
+
+    if options["encoding"] != "tree" and options["encoding"] not in cardinality.ENCODINGS:
+        raise Exception("ERROR: unknown counting encoding " + options["encoding"] + ", expected tree or one of " + ", ".join(cardinality.ENCODINGS))
+
+    if options["incremental"] is not None:
+        incremental.check_solver(options["incremental"])
+
+        if options["encoding"] != "tree":
+            raise Exception("ERROR: -i bounds the counting tree with assumptions and can't be combined with -e")
+
+        if options["speculative"] is not None:
+            raise Exception("ERROR: -s runs several solver processes at once and can't be combined with -i")
+        if len(options["solvers"]) > 0 or options["race"]:
+            raise Exception("ERROR: -i solves in-process and can't be combined with --solver, --timeout or --memory")
+
+    if options["speculative"] is not None:
+        if options["speculative"] < 1:
+            raise Exception("ERROR: -s needs at least 1 run at a time, got " + str(options["speculative"]))
+
+        if len(options["solvers"]) > 1:
+            raise Exception("ERROR: -s can't be combined with more than one --solver")
+
+        if options["grow"]:
+            raise Exception("ERROR: -s can't be combined with -g")
+
+        options["pipe"] = False # every run reads its own file, so they can be killed independently
+
+    if options["race"] or options["cache"] is not None:
+        options["pipe"] = False # the cache holds files, and every raced run needs one
+
+    if options["pipe"]:
+        options["compression"] = None # nothing goes to disk
+
+    if options["jobs"] is not None:
+        if options["jobs"] < 1:
+            raise Exception("ERROR: --jobs needs at least 1 job, got " + str(options["jobs"]))
+
+        # share the cores between the jobs and the runs each of them has going
+        if options["threads"] is None:
+            options["threads"] = batch.split_cores(options["jobs"], (options["speculative"] or 1) * max(1, len(options["solvers"])))
+
+    return files, outdir, options
+
+def get_grid_width(n):
+    # the grid width used unless the grid grows
+    if n >= 12:
+        grid_width = 1 + n//4
     else:
-        with open("./gurobi_output/" + file + ".sol") as f:
-            lines = f.readlines()
-            if "value =" in lines[0]:
-                contacts_found = re.search(r"\d+", lines[0]).group()
-            else:
-                contacts_found = 0
-                
-            time_elapsed[0] = end - start
-            return contacts_found
+        grid_width = n
+    return grid_width
 
-def main(argv):
-    if len(argv) <= 2:
-        print("ERROR: wrong number of arguments given\n\tUsage: main.py {list of input files} -o {output directory}")
-        return
+def get_min_grid_width(n):
+    # the smallest grid width with a cell for every residue
+    grid_width = 1
+
+    while pow(grid_width, 2) < n:
+        grid_width += 1
+
+    return grid_width
+
+def gen_prefix(string, grid_width, cnf_file, options):
+    # the part of the formula that doesn't depend on k, either for writing to
+    # cnf files or loaded into an incremental solver
+    n = len(string)
+    positions_of_ones = get_positions_of_ones(string)
+
+    if options["layout"] == "pruned":
+        pruned_grid = domains.Domains(n, grid_width, 2, positions_of_ones)
+        prefix_conditions = pruned_grid.gen_embedding_conditions() + pruned_grid.gen_contact_conditions()
+
+        if options["symmetry"]:
+            prefix_conditions += pruned_grid.gen_symmetry_conditions()
     else:
-        outdir_index = argv.index("-o") + 1
-        outdir = argv[outdir_index]
-    
-    files = argv[1:outdir_index - 1]
+        embedding_conditions = gen_embedding_conditions(n, grid_width)
+
+        if options["layout"] == "parity":
+            contact_conditions = parity.gen_parity_contact_conditions(n, grid_width, 2, positions_of_ones)
+        else:
+            contact_conditions = gen_contact_conditions(n, grid_width, positions_of_ones)
+
+        prefix_conditions = embedding_conditions + contact_conditions
+
+        if options["symmetry"]:
+            prefix_conditions += symmetry.gen_symmetry_conditions(n, grid_width, 2)
+
+    if options["incremental"] is not None:
+        return gen_incremental_formula(string, grid_width, prefix_conditions, options["incremental"], options["layout"])
+    else:
+        # the formulas streamed to the solver keep the segment in memory
+        segment_file = None if options["pipe"] else cnf_file + ".prefix"
+
+        return dimacs.CnfPrefix(prefix_conditions, segment_file, options["compression"], options["level"])
+
+def has_room(best_fold, grid_width):
+    # the best fold found, as (fold, contacts), fits in a grid one cell
+    # narrower than grid_width
+    return best_fold is not None and grid_width > 1 and folding.is_valid(best_fold[0], grid_width - 1)
+
+def grow_grid(string, cnf_file, time_elapsed, options):
+    # Maximize the contacts on the smallest grid that holds the string, then on
+    # grids one cell wider at a time, up to options["max_width"] or the usual
+    # grid width. Every fold on a grid also fits on the wider ones, so the
+    # contacts found so far stay SAT, and a wider grid usually only needs k one
+    # above them tested. Growing stops once the contacts reach the upper bound,
+    # which no wider grid can beat, or once the best fold found fits in a grid
+    # one cell narrower, so the last cell of width didn't buy any contacts.
+    # Returns the contacts found and the grid widths tried.
+    n = len(string)
+    max_width = min(n, options["max_width"] or get_grid_width(n)) # every fold fits on a grid n cells wide
+    bound = bounds.get_contact_bound(string, 2)
+    best = 0
+    grid_widths = list()
+
+    # a heuristic fold for the widest grid counts on every grid it fits in
+    if options["fold"]:
+        fold, fold_contacts = folding.fold_sequence(string, 2, max_width)
+
+    for grid_width in range(min(get_min_grid_width(n), max_width), max_width + 1):
+        print("Maximizing contacts on a grid of width", grid_width)
+        grid_widths.append(grid_width)
+
+        if options["fold"] and fold is not None and folding.is_valid(fold, grid_width):
+            best = max(best, fold_contacts)
+
+            if time_elapsed[3] is None:
+                time_elapsed[3] = (fold, fold_contacts)
+
+        prefix = gen_prefix(string, grid_width, cnf_file, options)
+
+        # only the SAT answers carry over from the narrower grids
+        k_vals_tried = dict((k, True) for k in range(1, best + 1))
+        max_contacts = maximize_contacts(string, grid_width, best + 1, prefix, cnf_file, time_elapsed, options, k_vals_tried)
+        prefix.close()
+
+        if max_contacts is None:
+            return None, grid_widths
+
+        best = max(best, max_contacts)
+
+        # a run without an answer leaves only a lower bound, and wider grids
+        # can't tell any more
+        if time_elapsed[5] is not None:
+            break
+
+        # no wider grid can beat the upper bound
+        if best >= bound:
+            break
 
-    for file_name in files:
-        string = read_data("./input/" + file_name)
+        if has_room(time_elapsed[3], grid_width):
+            print("The best fold fits in a grid of width", grid_width - 1, "so the grid stops growing")
+            break
 
-        if not is_binary_string(string):
-            print("Error:", string, " is not a binary string")
-            continue
+    return best, grid_widths
 
-        n = len(string)
+def run_sequence(file_name, outdir, options):
+    # find the maximum number of contacts for one input file with glucose-syrup,
+    # append the results to its output file and return the answer
+    string = read_data("./input/" + file_name)
 
-        if n >= 12:
-            grid_width = 1 + n//4
+    if not is_binary_string(string):
+        print("Error:", string, " is not a binary string")
+        return
+
+    n = len(string)
+    grid_width = get_grid_width(n)
+
+    # in batch mode every job writes its cnf files to a directory of its own, so
+    # jobs running at the same time never share a file name
+    if options["jobs"] is not None:
+        cnf_dir = tempfile.mkdtemp(prefix=file_name + ".", dir="./lingeling/input")
+    else:
+        cnf_dir = "./lingeling/input"
+
+    k = 1 # start by looking for only one contact
+    ling_output_file = dimacs.cnf_path(cnf_dir + "/" + file_name + ".cnf", options["compression"])
+
+    outfile = outdir + "/" + file_name + "_opt.txt"
+    ling_time_elapsed = [0,0,dict(),None,0,None] # solver time, solver runs, the wins of each raced solver, the fold with the most contacts found, the answers read from the results store, and why the search stopped without an answer
+    gurobi_time_elapsed = [0, None] # ILP solver time, and the contacts of the fold it started from
+    search_stats = dict()
+    k_vals_tried = dict()
+
+    # the job's directory is removed even if the search fails, so a batch
+    # doesn't leave the cnf files of its failed jobs behind
+    try:
+        # contacts of a heuristic fold that fits in the grid are SAT, so the
+        # search starts above them
+        if options["fold"] and not options["grow"]:
+            fold, fold_contacts = folding.fold_sequence(string, 2, grid_width)
+            k_vals_tried = dict((k, True) for k in range(1, fold_contacts + 1))
+            k = fold_contacts + 1
+
+            if fold is not None:
+                ling_time_elapsed[3] = (fold, fold_contacts)
+
+        if options["grow"]:
+            lingeling_max_contacts, grid_widths = grow_grid(string, ling_output_file, ling_time_elapsed, options)
+        elif options["speculative"] is not None:
+            prefix = gen_prefix(string, grid_width, ling_output_file, options)
+            write_cnf = lambda k, file: write_cnf_file(string, grid_width, k, prefix, file, options)
+            probe_file = lambda k: dimacs.probe_path(ling_output_file, k)
+            max_k = bounds.get_contact_bound(string, 2) if options["bound"] else None
+            decode = lambda k, result: decode_contacts(string, grid_width, k, result, None, ling_time_elapsed, options)
+            record = None
+            min_k = k - 1
+
+            if options["results"] is not None:
+                # the search only needs the k between the answers stored so far
+                answers = results.get_answers(options["results"], get_results_key(string, grid_width, options))
+                min_k = max([min_k] + [j for j in answers if answers[j] == 10])
+                unsat = [j - 1 for j in answers if answers[j] == 20]
+
+                if max_k is not None:
+                    unsat.append(max_k)
+
+                if len(unsat) > 0:
+                    max_k = min(unsat)
+
+                ling_time_elapsed[4] = len(answers)
+                record = lambda k, result, time_taken: record_result(string, grid_width, k, result, " ".join(get_portfolio(options)[0]), time_taken, None, options)
+
+            lingeling_max_contacts = speculative.search(write_cnf, probe_file, get_portfolio(options)[0], options["speculative"], search_stats, options["memory"], max_k, min_k, decode if options["model"] else None, record, options["timeout"])
+            prefix.close()
+            ling_time_elapsed = [search_stats["time"], search_stats["runs"], dict(), ling_time_elapsed[3], ling_time_elapsed[4], search_stats["stopped"]]
+        else:
+            prefix = gen_prefix(string, grid_width, ling_output_file, options)
+            lingeling_max_contacts = maximize_contacts(string, grid_width, k, prefix, ling_output_file, ling_time_elapsed, options, k_vals_tried)
+            prefix.close()
+    finally:
+        if options["jobs"] is not None:
+            shutil.rmtree(cnf_dir)
+
+    out = io.StringIO()
+    print("\nMaximum contacts found for", string, "using glucose syrup:", lingeling_max_contacts, file=out)
+    print("glucose-syrup time taken:", ling_time_elapsed[0], file=out)
+    print("glucose-syrup runs required:", ling_time_elapsed[1], file=out)
+
+    if ling_time_elapsed[5] is not None:
+        print("search stopped early, the contacts found are only a lower bound:", ling_time_elapsed[5], file=out)
+
+    if options["race"] and options["speculative"] is None:
+        # the racers are the --solver portfolio if one was given
+        if len(options["solvers"]) > 0:
+            print("portfolio wins by solver:", ling_time_elapsed[2], file=out)
         else:
-            grid_width = n
+            print("glucose-syrup wins by solver:", ling_time_elapsed[2], file=out)
 
-        k = 1 # start by looking for only one contact
-        ling_output_file = "./lingeling/input/" + file_name + ".cnf"
-        embedding_conditions = gen_embedding_conditions(n, grid_width)
-        positions_of_ones = get_positions_of_ones(string)
-        contact_conditions = gen_contact_conditions(n, grid_width, positions_of_ones)
-        outfile = outdir + "/" + file_name + "_opt.txt"
-        ling_time_elapsed = [0,0]
-        #gurobi_time_elapsed = [0]
+    if options["results"] is not None:
+        print("glucose-syrup answers read from the results store:", ling_time_elapsed[4], file=out)
+
+    if options["speculative"] is not None:
+        print("glucose-syrup runs wasted:", len(search_stats["wasted"]), search_stats["wasted"], file=out)
+
+    if options["fold"] and not options["grow"]:
+        print("heuristic fold contacts:", fold_contacts, file=out)
+
+        if options["speculative"] is None and lingeling_max_contacts is not None and ling_time_elapsed[5] is None:
+            bound = bounds.get_contact_bound(string, 2) if options["bound"] else None
+            print("glucose-syrup runs saved by the heuristic fold:", count_search_runs(lingeling_max_contacts, 1, dict(), bound) - ling_time_elapsed[1], file=out)
+
+    if ling_time_elapsed[3] is not None:
+        print("best fold found:", list(ling_time_elapsed[3][0]), file=out)
+        print("contacts in the best fold:", ling_time_elapsed[3][1], file=out)
+
+    if options["bound"]:
+        print("upper bound on contacts:", bounds.get_contact_bound(string, 2), file=out)
 
-        lingeling_max_contacts = maximize_contacts(string, grid_width, k, embedding_conditions, contact_conditions, ling_output_file, ling_time_elapsed, dict())
-        with open(outfile, "a+") as out:
-            print("\nMaximum contacts found for", string, "using glucose syrup:", lingeling_max_contacts, file=out)
-            print("glucose-syrup time taken:", ling_time_elapsed[0], file=out)
-            print("glucose-syrup runs required:", ling_time_elapsed[1], file=out)
+    if options["grow"]:
+        # the maximum is certified if every fold fits in the last grid or the
+        # contacts reach the upper bound. A best fold with room to spare only
+        # stops the growing, since a wider grid may still hold other folds.
+        fits = len(grid_widths) > 0 and grid_widths[-1] >= n
+        at_bound = lingeling_max_contacts is not None and lingeling_max_contacts >= bounds.get_contact_bound(string, 2)
+        certified = at_bound or (fits and lingeling_max_contacts is not None and ling_time_elapsed[5] is None)
+        print("grid widths tried:", grid_widths, file=out)
+        print("every fold fits in the grid:", fits, file=out)
+        print("contacts reach the upper bound:", at_bound, file=out)
+        print("best fold has room in the grid:", has_room(ling_time_elapsed[3], grid_widths[-1]), file=out)
+        print("maximum certified:", certified, file=out)
 
-        #gurobi_max_contacts = maximize_with_gurobi(file_name, gurobi_time_elapsed, n)
+        if lingeling_max_contacts is not None and not certified and not fits:
+            print("the grid stopped growing at width", grid_widths[-1], "below the width", n, "that holds every fold, so the contacts found are only a lower bound on the maximum", file=out)
+
+    batch.append_result(outfile, out.getvalue())
+
+    # the ILP side of the comparison only runs if an ILP solver is picked
+    if options["ilp"] is not None:
+        gurobi_max_contacts = maximize_with_ilp(file_name, string, gurobi_time_elapsed, options, ling_time_elapsed[3] if options["warm_start"] else None)
+
+        out = io.StringIO()
+        print("Maximum contacts found for", string, "using " + options["ilp"] + ":", gurobi_max_contacts, file=out)
+        print(ilp.SOLVER_NAMES[options["ilp"]], "time taken:", gurobi_time_elapsed[0], file=out)
+
+        if gurobi_time_elapsed[1] is not None:
+            print(ilp.SOLVER_NAMES[options["ilp"]], "started from a fold with", gurobi_time_elapsed[1], "contacts", file=out)
+
+        batch.append_result(outfile, out.getvalue())
+
+    return lingeling_max_contacts
+
+def main(argv):
+    if len(argv) < 2:
+        print("ERROR: wrong number of arguments given\n\tUsage: HPsat-pipeline.py {list of input files} -o {output directory} -z {gz or xz} -l {compression level} -p -b -u -f -m --parity --prune -e {tree, sequential, totalizer, modulo or network} -g --max-width {largest grid width} -i {PySAT solver name} -s {runs at a time} --jobs {sequences at a time} --threads {solver threads} --solver {solver command} --timeout {seconds} --memory {megabytes} --results {results database} --cache {cnf cache directory} --cache-size {megabytes} --ilp {gurobi, highs or cbc} --ilp-timeout {seconds} --lp-dir {lp file directory} --warm-start")
+        return
+
+    files, outdir, options = parse_args(argv)
+
+    if options["jobs"] is None:
+        for file_name in files:
+            run_sequence(file_name, outdir, options)
+    else:
+        jobs_args = [(file_name, outdir, options) for file_name in files]
 
-        #with open(outfile, "a+") as out:
-        #    print("Maximum contacts found for", string, "using gurobi:", gurobi_max_contacts, file=out)
-        #    print("Gurobi time taken:", gurobi_time_elapsed[0], file=out)
+        for args, max_contacts in batch.run_jobs(run_sequence, jobs_args, options["jobs"]):
+            print("Finished", args[0] + ":", max_contacts, "contacts")
 
-#main(sys.argv)
+    return 0
 
-#main(["HPsat.py", "1gd2J0", "1pspA1", "-o", "./glucose-syrup-output"])
-main(["main.py", "1meyF2", "1bbo01", "1a1iA3", "1ubdC2", "1ubdC1", "1aym40", "2drpD2", "2gliA5", "2adr01", "1a1iA1", "1rmd02", "1tf3A2", "1tf3A1", "1b0nB0", "1dp5B0", "1d4vA2", "-o", "./glucose-syrup-output"])
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,43 @@
+# Runs the pipelines over many sequences at once in a pool of worker processes.
+# The cores of the machine are split between the workers and the threads of
+# the solvers they run, and results are appended to the output files with a
+# single write each, so records from different workers never interleave.
+
+import os
+import concurrent.futures
+
+def split_cores(jobs, runs_per_job = 1):
+    # solver threads for each of the jobs * runs_per_job solver runs going at once
+    return max(1, (os.cpu_count() or 1) // (jobs * runs_per_job))
+
+def append_result(file, text):
+    # Append text to file with one write on a descriptor opened with O_APPEND.
+    # Every write then lands at the end of the file as a whole, even if other
+    # workers are appending results to the same file at the same time.
+    data = text.encode()
+    fd = os.open(file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    try:
+        while len(data) > 0:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+def run_jobs(function, jobs_args, jobs):
+    # call function(*args) for every args in jobs_args in a pool of jobs worker
+    # processes, yielding args and the result of each call as they finish. A job
+    # that raises an exception is reported and yields None.
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = dict()
+
+        for args in jobs_args:
+            futures[pool.submit(function, *args)] = args
+
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                print("ERROR: job", futures[future], "failed:", e)
+                result = None
+
+            yield futures[future], result
@@ -0,0 +1,251 @@
+# Benchmarks for the HPsat generators and the solvers run by the pipelines.
+# Each benchmark prints a table to stdout so it can be redirected into the
+# output directories alongside the pipeline results.
+#
+# Usage:
+#   python3 benchmark.py compression {input file} {2 or 3} {goal number of contacts} {optional solver command}
+#   python3 benchmark.py counting {2 or 3} {smallest grid width} {largest grid width}
+#   python3 benchmark.py symmetry {input file} {2 or 3} {goal numbers of contacts, comma separated} {solver command}
+#   python3 benchmark.py layouts {input file} {2 or 3} {goal numbers of contacts, comma separated} {solver command}
+#   python3 benchmark.py encodings {input files, comma separated, or all} {2 or 3} {goal number of contacts} {optional solver command}
+
+import sys
+import os
+import time
+import tempfile
+import subprocess
+import importlib.util
+import dimacs
+import symmetry
+import cardinality
+import parity
+import domains
+
+def load_generator(dimension):
+    # HPsat-3D.py can't be imported by name because of the dash, so both
+    # generators are loaded straight from their files
+    path = "./HPsat.py" if dimension == 2 else "./HPsat-3D.py"
+    spec = importlib.util.spec_from_file_location("HPsat_" + str(dimension) + "D", path)
+    generator = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(generator)
+
+    return generator
+
+def get_grid_width(n, dimension):
+    # same grid widths as the pipelines
+    if dimension == 2:
+        return 1 + n//4 if n >= 12 else n
+    else:
+        return 2 + n//8 if n >= 20 else 2 + n//4
+
+def gen_conditions(generator, string, dimension, k, symmetry_breaking = False, encoding = "tree", layout = "grid"):
+    n = len(string)
+    grid_width = get_grid_width(n, dimension)
+    positions_of_ones = generator.get_positions_of_ones(string)
+    num_adjacent_ones = generator.get_num_adjacent_ones(positions_of_ones)
+    contact_vars = generator.get_contact_vars(n, grid_width, positions_of_ones, layout)
+    r = contact_vars[1] - (num_adjacent_ones + k)
+
+    if layout == "pruned":
+        pruned_grid = domains.Domains(n, grid_width, dimension, positions_of_ones)
+        embedding_conditions = pruned_grid.gen_embedding_conditions()
+        contact_conditions = pruned_grid.gen_contact_conditions()
+    else:
+        embedding_conditions = generator.gen_embedding_conditions(n, grid_width)
+
+        if layout == "parity":
+            contact_conditions = parity.gen_parity_contact_conditions(n, grid_width, dimension, positions_of_ones)
+        else:
+            contact_conditions = generator.gen_contact_conditions(n, grid_width, positions_of_ones)
+
+    counting_conditions, num_vars = generator.gen_encoded_counting_conditions(n, grid_width, r, encoding, contact_vars)
+    conditions = embedding_conditions + contact_conditions + counting_conditions
+
+    if symmetry_breaking and layout == "pruned":
+        conditions += pruned_grid.gen_symmetry_conditions()
+    elif symmetry_breaking:
+        conditions += symmetry.gen_symmetry_conditions(n, grid_width, dimension)
+
+    return conditions, num_vars, generator.get_num_clauses(n, conditions)
+
+def time_solver(solver, file):
+    # wall time of one solver run. The formula is the same for every output
+    # mode, so differences between modes are the cost of reading the file.
+    start = time.time()
+    result = subprocess.run(solver + [file], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    end = time.time()
+
+    return end - start, result.returncode
+
+def bench_compression(argv):
+    file_name = argv[0]
+    dimension = int(argv[1])
+    k = int(argv[2])
+    solver = argv[3:]
+    generator = load_generator(dimension)
+    string = generator.read_data("./input/" + file_name)
+    conditions, num_vars, num_clauses = gen_conditions(generator, string, dimension, k)
+    modes = [(None, None), ("gz", 1), ("gz", 6), ("gz", 9), ("xz", 0), ("xz", 1), ("xz", 6)]
+    outdir = tempfile.mkdtemp()
+
+    print("string:", string)
+    print("variables:", num_vars, "clauses:", num_clauses)
+    print("%-6s %5s %12s %14s %12s" % ("mode", "level", "write (s)", "size (bytes)", "solver (s)"))
+
+    for compression, level in modes:
+        file = dimacs.cnf_path(outdir + "/" + file_name + ".cnf", compression)
+        start = time.time()
+        generator.write_conditions(num_vars, num_clauses, conditions, file, compression, level)
+        end = time.time()
+        size = os.path.getsize(file)
+
+        if len(solver) > 0:
+            solver_time = "%12.3f" % time_solver(solver, file)[0]
+        else:
+            solver_time = "%12s" % "-"
+
+        print("%-6s %5s %12.3f %14d %s" % (compression or "plain", "-" if level is None else level, end - start, size, solver_time))
+        os.remove(file)
+
+    os.rmdir(outdir)
+
+def bench_counting(argv):
+    # time gen_counting_conditions alone for every grid width in a range. The
+    # tree only depends on the number of contact variables and on r, so the
+    # string is left out and r is the largest any k can ask for, which builds
+    # the biggest tree.
+    dimension = int(argv[0])
+    min_width = int(argv[1])
+    max_width = int(argv[2])
+    generator = load_generator(dimension)
+
+    print("%5s %8s %10s %10s %12s" % ("width", "leaves", "variables", "clauses", "build (s)"))
+
+    for grid_width in range(min_width, max_width + 1):
+        num_leaves = dimension * pow(grid_width, dimension)
+        r = num_leaves - 1
+        start = time.time()
+        counting_conditions, num_vars = generator.gen_counting_conditions(grid_width, grid_width, r)
+        end = time.time()
+        num_clauses = generator.get_num_clauses(grid_width, counting_conditions)
+
+        print("%5d %8d %10d %10d %12.3f" % (grid_width, num_leaves, num_vars, num_clauses, end - start))
+
+def bench_symmetry(argv):
+    # solver time for each goal number of contacts with and without the
+    # symmetry breaking clauses
+    file_name = argv[0]
+    dimension = int(argv[1])
+    goals = [int(k) for k in argv[2].split(",")]
+    solver = argv[3:]
+    generator = load_generator(dimension)
+    string = generator.read_data("./input/" + file_name)
+    outdir = tempfile.mkdtemp()
+    file = outdir + "/" + file_name + ".cnf"
+
+    print("string:", string)
+    print("%5s %9s %10s %12s %8s" % ("k", "symmetry", "clauses", "solver (s)", "answer"))
+
+    for k in goals:
+        for symmetry_breaking in [False, True]:
+            conditions, num_vars, num_clauses = gen_conditions(generator, string, dimension, k, symmetry_breaking)
+            generator.write_conditions(num_vars, num_clauses, conditions, file)
+            solver_time, returncode = time_solver(solver, file)
+            answer = {10: "SAT", 20: "UNSAT"}.get(returncode, "error")
+
+            print("%5d %9s %10d %12.3f %8s" % (k, "yes" if symmetry_breaking else "no", num_clauses, solver_time, answer))
+
+    os.remove(file)
+    os.rmdir(outdir)
+
+def bench_layouts(argv):
+    # size of the formula and solver time for each goal number of contacts with
+    # the usual variables, the contact variables from parity.py and the pruned
+    # grid from domains.py, and the size of each as a share of the usual one
+    file_name = argv[0]
+    dimension = int(argv[1])
+    goals = [int(k) for k in argv[2].split(",")]
+    solver = argv[3:]
+    generator = load_generator(dimension)
+    string = generator.read_data("./input/" + file_name)
+    outdir = tempfile.mkdtemp()
+    file = outdir + "/" + file_name + ".cnf"
+
+    print("string:", string)
+    print("%5s %7s %10s %7s %10s %7s %12s %8s" % ("k", "layout", "variables", "%", "clauses", "%", "solver (s)", "answer"))
+
+    for k in goals:
+        for layout in ["grid", "parity", "pruned"]:
+            conditions, num_vars, num_clauses = gen_conditions(generator, string, dimension, k, layout=layout)
+            generator.write_conditions(num_vars, num_clauses, conditions, file)
+            solver_time, returncode = time_solver(solver, file)
+            answer = {10: "SAT", 20: "UNSAT"}.get(returncode, "error")
+
+            if layout == "grid":
+                grid_vars, grid_clauses = num_vars, num_clauses
+
+            print("%5d %7s %10d %7.1f %10d %7.1f %12.3f %8s" % (k, layout, num_vars, 100 * num_vars / grid_vars, num_clauses, 100 * num_clauses / grid_clauses, solver_time, answer))
+
+    os.remove(file)
+    os.rmdir(outdir)
+
+def bench_encodings(argv):
+    # size and build time of the counting conditions with every encoding, and
+    # the solver time on the whole formula, for each sequence
+    if argv[0] == "all":
+        file_names = sorted(f for f in os.listdir("./input") if "." not in f)
+    else:
+        file_names = argv[0].split(",")
+
+    dimension = int(argv[1])
+    k = int(argv[2])
+    solver = argv[3:]
+    generator = load_generator(dimension)
+    encodings = ["tree"] + list(cardinality.ENCODINGS)
+    outdir = tempfile.mkdtemp()
+
+    print("%-12s %-10s %10s %10s %10s %12s %8s" % ("file", "encoding", "variables", "clauses", "build (s)", "solver (s)", "answer"))
+
+    for file_name in file_names:
+        string = generator.read_data("./input/" + file_name)
+        n = len(string)
+        grid_width = get_grid_width(n, dimension)
+        positions_of_ones = generator.get_positions_of_ones(string)
+        r = dimension * pow(grid_width, dimension) - (generator.get_num_adjacent_ones(positions_of_ones) + k)
+        prefix_conditions = generator.gen_embedding_conditions(n, grid_width) + generator.gen_contact_conditions(n, grid_width, positions_of_ones)
+        file = outdir + "/" + file_name + ".cnf"
+
+        for encoding in encodings:
+            start = time.time()
+            counting_conditions, num_vars = generator.gen_encoded_counting_conditions(n, grid_width, r, encoding)
+            end = time.time()
+            conditions = prefix_conditions + counting_conditions
+            num_clauses = generator.get_num_clauses(n, conditions)
+
+            if len(solver) > 0:
+                generator.write_conditions(num_vars, num_clauses, conditions, file)
+                solver_time, returncode = time_solver(solver, file)
+                solver_time = "%12.3f" % solver_time
+                answer = {10: "SAT", 20: "UNSAT"}.get(returncode, "error")
+                os.remove(file)
+            else:
+                solver_time = "%12s" % "-"
+                answer = "-"
+
+            print("%-12s %-10s %10d %10d %10.3f %s %8s" % (file_name, encoding, num_vars, num_clauses, end - start, solver_time, answer))
+
+    os.rmdir(outdir)
+
+def main(argv):
+    benchmarks = {"compression": bench_compression, "counting": bench_counting, "symmetry": bench_symmetry, "layouts": bench_layouts, "encodings": bench_encodings}
+
+    if len(argv) < 2 or argv[1] not in benchmarks:
+        print("ERROR: wrong arguments given\n\tUsage: python3 benchmark.py {" + " or ".join(benchmarks) + "} {benchmark arguments}")
+        return 1
+
+    benchmarks[argv[1]](argv[2:])
+
+    return 0
+
+if __name__ == "__main__":
+    main(sys.argv)
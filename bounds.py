@@ -0,0 +1,33 @@
+# Upper bounds on the number of contacts a sequence can make, computed from the
+# sequence alone. A contact here is the k of the pipelines: two H residues on
+# neighbouring cells that aren't next to each other in the chain.
+#
+# The square and cubic lattices are bipartite, so residues i and j can only be
+# on neighbouring cells if j - i is odd, and every contact pairs an even
+# indexed H with an odd indexed one. A cell has 2 * dimension neighbours and
+# the chain takes up two of them around every residue but the ends, which only
+# lose one. So the contacts are at most the free neighbours of the even indexed
+# H residues, at most those of the odd indexed ones, and at most the number of
+# even-odd pairs of H residues at least 3 apart in the chain.
+
+def get_num_free_neighbours(i, n, dimension):
+    # neighbours of residue i not taken up by the residues next to it
+    num_chain_neighbours = (1 if i > 0 else 0) + (1 if i < n - 1 else 0)
+
+    return 2 * dimension - num_chain_neighbours
+
+def get_contact_bound(string, dimension):
+    n = len(string)
+    positions_of_ones = [i for i in range(0, n) if string[i] == "1"]
+    even_slots = sum(get_num_free_neighbours(i, n, dimension) for i in positions_of_ones if i % 2 == 0)
+    odd_slots = sum(get_num_free_neighbours(i, n, dimension) for i in positions_of_ones if i % 2 == 1)
+    num_pairs = 0
+
+    for a in range(0, len(positions_of_ones) - 1):
+        for b in range(a + 1, len(positions_of_ones)):
+            distance = positions_of_ones[b] - positions_of_ones[a]
+
+            if distance % 2 == 1 and distance >= 3:
+                num_pairs += 1
+
+    return min(even_slots, odd_slots, num_pairs)
@@ -0,0 +1,238 @@
+# Cardinality encodings for the counting stage of the HPsat formulas. The
+# generators count non-contacts, so every encoding here takes the negated
+# contact variables and a bound r and makes at most r of them true, which is
+# the same as asking for at least k contacts. The unary counter tree built by
+# gen_counting_conditions in the generators is the "tree" encoding; the ones
+# here trade variables and clauses differently:
+#   * sequential: Sinz's sequential counter, O(n * r) clauses in a chain
+#   * totalizer: a tree of unary counters capped at r + 1, O(n * r) clauses
+#     but only O(log n) deep
+#   * modulo: the modulo totalizer, which counts in two unary digits of base
+#     about sqrt(r), with far fewer clauses than the totalizer for large r
+#   * network: an odd-even merge sorting network, O(n log^2 n) clauses
+#     whatever r is
+# Every encoding only has the clauses that push its counts up, so a solver can
+# over-count but never under-count, and a bound on the counts is a bound on
+# the literals.
+#
+# Each encoding takes the literals, the bound and the number of variables
+# already used, and returns list([conditions, num_vars]) like
+# gen_counting_conditions does.
+
+import math
+from Condition import Condition
+
+def gen_sequential_counter(literals, bound, num_vars):
+    # s_ij (variable num_vars + i * bound + j) is true if at least j of the
+    # first i + 1 literals are
+    condition = Condition(list())
+    num_literals = len(literals)
+    s = lambda i, j: num_vars + i * bound + j
+
+    condition.add_clause([-1 * literals[0], s(0, 1)])
+
+    for j in range(2, bound + 1):
+        condition.add_clause([-1 * s(0, j)])
+
+    for i in range(1, num_literals - 1):
+        condition.add_clause([-1 * literals[i], s(i, 1)])
+        condition.add_clause([-1 * s(i - 1, 1), s(i, 1)])
+
+        for j in range(2, bound + 1):
+            condition.add_clause([-1 * literals[i], -1 * s(i - 1, j - 1), s(i, j)])
+            condition.add_clause([-1 * s(i - 1, j), s(i, j)])
+
+        condition.add_clause([-1 * literals[i], -1 * s(i - 1, bound)])
+
+    condition.add_clause([-1 * literals[num_literals - 1], -1 * s(num_literals - 2, bound)])
+
+    return list([[condition], num_vars + (num_literals - 1) * bound])
+
+def add_sum_clauses(condition, left, right, outputs, carry = None):
+    # outputs[t - 1] is true if at least t of left and right together are,
+    # counting the carry as one more if it's given
+    extra = 0 if carry is None else 1
+
+    for i in range(0, len(left) + 1):
+        for j in range(0, len(right) + 1):
+            if i + j + extra < 1 or i + j + extra > len(outputs):
+                continue
+
+            clause = list()
+
+            if i > 0:
+                clause.append(-1 * left[i - 1])
+            if j > 0:
+                clause.append(-1 * right[j - 1])
+            if carry is not None:
+                clause.append(-1 * carry)
+
+            clause.append(outputs[i + j + extra - 1])
+            condition.add_clause(clause)
+
+def gen_totalizer_node(condition, literals, cap, num_vars):
+    # unary count of the literals, capped at cap, as a list of variables
+    if len(literals) == 1:
+        return list([[literals[0]], num_vars])
+
+    half = len(literals) // 2
+    left, num_vars = gen_totalizer_node(condition, literals[:half], cap, num_vars)
+    right, num_vars = gen_totalizer_node(condition, literals[half:], cap, num_vars)
+    num_outputs = min(len(left) + len(right), cap)
+    outputs = list(range(num_vars + 1, num_vars + num_outputs + 1))
+    add_sum_clauses(condition, left, right, outputs)
+
+    return list([outputs, num_vars + num_outputs])
+
+def gen_totalizer(literals, bound, num_vars):
+    condition = Condition(list())
+    root, num_vars = gen_totalizer_node(condition, literals, bound + 1, num_vars)
+    condition.add_clause([-1 * root[bound]])
+
+    return list([[condition], num_vars])
+
+def gen_modulo_node(condition, literals, modulus, cap, num_vars):
+    # the count of the literals as a unary lower digit (count % modulus, up to
+    # modulus - 1 variables) and a unary upper digit (count // modulus, capped
+    # at cap). Counts of cap * modulus and more all look the same.
+    if len(literals) == 1:
+        return list([[literals[0]], list(), num_vars])
+
+    half = len(literals) // 2
+    left_lower, left_upper, num_vars = gen_modulo_node(condition, literals[:half], modulus, cap, num_vars)
+    right_lower, right_upper, num_vars = gen_modulo_node(condition, literals[half:], modulus, cap, num_vars)
+    num_lower = min(modulus - 1, len(literals))
+    # room in the upper digit for every literal, since a carry set below the
+    # modulus leaves the lower digit short and only the upper digit covers it
+    num_upper = min(-1 * (-1 * len(literals) // modulus), cap)
+    lower = list(range(num_vars + 1, num_vars + num_lower + 1))
+    upper = list(range(num_vars + num_lower + 1, num_vars + num_lower + num_upper + 1))
+    num_vars += num_lower + num_upper
+    carry = None
+
+    if len(left_lower) + len(right_lower) >= modulus:
+        num_vars += 1
+        carry = num_vars
+
+    # the lower digits wrap around into the carry. Below the modulus the carry
+    # may still be set, which only over-counts.
+    for i in range(0, len(left_lower) + 1):
+        for j in range(0, len(right_lower) + 1):
+            if i + j < 1:
+                continue
+
+            clause = list()
+
+            if i > 0:
+                clause.append(-1 * left_lower[i - 1])
+            if j > 0:
+                clause.append(-1 * right_lower[j - 1])
+
+            if i + j < modulus:
+                if carry is not None:
+                    clause.append(carry)
+
+                condition.add_clause(clause + [lower[i + j - 1]])
+            else:
+                condition.add_clause(clause + [carry])
+
+                if i + j > modulus:
+                    condition.add_clause(clause + [lower[i + j - modulus - 1]])
+
+    add_sum_clauses(condition, left_upper, right_upper, upper)
+
+    if carry is not None:
+        add_sum_clauses(condition, left_upper, right_upper, upper, carry)
+
+    return list([lower, upper, num_vars])
+
+def gen_modulo_totalizer(literals, bound, num_vars):
+    condition = Condition(list())
+    modulus = max(2, math.ceil(math.sqrt(bound + 1)))
+    upper_bound, lower_bound = divmod(bound + 1, modulus)
+    lower, upper, num_vars = gen_modulo_node(condition, literals, modulus, upper_bound + 1, num_vars)
+
+    # forbid a count of bound + 1 or more
+    if upper_bound < len(upper):
+        condition.add_clause([-1 * upper[upper_bound]])
+
+    clause = list()
+
+    if upper_bound > 0:
+        clause.append(-1 * upper[upper_bound - 1])
+    if lower_bound > 0:
+        clause.append(-1 * lower[lower_bound - 1])
+
+    condition.add_clause(clause)
+
+    return list([[condition], num_vars])
+
+def gen_comparator(condition, a, b, num_vars):
+    # the larger and smaller of a and b, where None is false
+    if a is None:
+        return list([b, None, num_vars])
+    elif b is None:
+        return list([a, None, num_vars])
+
+    larger = num_vars + 1
+    smaller = num_vars + 2
+    condition.add_clause([-1 * a, larger])
+    condition.add_clause([-1 * b, larger])
+    condition.add_clause([-1 * a, -1 * b, smaller])
+
+    return list([larger, smaller, num_vars + 2])
+
+def gen_merge(condition, left, right, num_vars):
+    # merge two sorted lists of the same power of 2 length, largest first
+    if len(left) == 1:
+        larger, smaller, num_vars = gen_comparator(condition, left[0], right[0], num_vars)
+        return list([[larger, smaller], num_vars])
+
+    odd, num_vars = gen_merge(condition, left[0::2], right[0::2], num_vars)
+    even, num_vars = gen_merge(condition, left[1::2], right[1::2], num_vars)
+    merged = [odd[0]]
+
+    for i in range(0, len(even) - 1):
+        larger, smaller, num_vars = gen_comparator(condition, even[i], odd[i + 1], num_vars)
+        merged.extend([larger, smaller])
+
+    merged.append(even[len(even) - 1])
+
+    return list([merged, num_vars])
+
+def gen_sort(condition, literals, num_vars):
+    if len(literals) == 1:
+        return list([literals, num_vars])
+
+    half = len(literals) // 2
+    left, num_vars = gen_sort(condition, literals[:half], num_vars)
+    right, num_vars = gen_sort(condition, literals[half:], num_vars)
+
+    return gen_merge(condition, left, right, num_vars)
+
+def gen_sorting_network(literals, bound, num_vars):
+    # pad the literals to a power of 2 with false and sort them
+    condition = Condition(list())
+    size = pow(2, math.ceil(math.log(len(literals), 2)))
+    padded = list(literals) + [None] * (size - len(literals))
+    outputs, num_vars = gen_sort(condition, padded, num_vars)
+    condition.add_clause([-1 * outputs[bound]])
+
+    return list([[condition], num_vars])
+
+ENCODINGS = {"sequential": gen_sequential_counter, "totalizer": gen_totalizer, "modulo": gen_modulo_totalizer, "network": gen_sorting_network}
+
+def gen_at_most(encoding, literals, bound, num_vars):
+    # at most bound of the literals are true, with the named encoding
+    if encoding not in ENCODINGS:
+        raise Exception("ERROR: unknown cardinality encoding " + encoding + ", expected one of " + ", ".join(ENCODINGS))
+
+    if bound < 0:
+        # no assignment has fewer than 0 true literals
+        return list([[Condition([[num_vars + 1], [-1 * (num_vars + 1)]])], num_vars + 1])
+    elif bound >= len(literals):
+        return list([list(), num_vars])
+    elif bound == 0:
+        return list([[Condition([[-1 * x] for x in literals])], num_vars])
+
+    return ENCODINGS[encoding](literals, bound, num_vars)
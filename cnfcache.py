@@ -0,0 +1,95 @@
+# Content-addressed cache of the .cnf files written by the pipelines. A file is
+# stored under a hash of everything that goes into it (the generator, the
+# string, the grid width, k and the options that change the clauses or the
+# compression), so a rerun, or another sequence with the same binary string,
+# finds the file instead of generating it again. Files are shared by hard
+# links where the file system allows it, so workers solving the same formula
+# share one copy on disk. Nothing is ever written to a file in the cache in
+# place: a new file is linked in under a temporary name and renamed, and a
+# file is always unlinked before it is written over, so a cached copy can't be
+# changed through a link to it.
+#
+# The cache is bounded in size and evicts the least recently used files, using
+# the modification time of each file as the time it was last used.
+
+import os
+import shutil
+import hashlib
+
+# bump this whenever a change to the generators changes the clauses they write,
+# so files written before the change are no longer found
+CNF_FORMAT_VERSION = 1
+
+def get_key(inputs):
+    # hash of the generator inputs, given as a list of values
+    text = repr([CNF_FORMAT_VERSION] + list(inputs))
+
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def get_path(directory, key):
+    return os.path.join(directory, key + ".cnf")
+
+def link_or_copy(source, target):
+    # make target a hard link to source, or a copy of it if that fails
+    release(target)
+
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+def release(file):
+    # unlink file before it is written over, since it may be a link to a file
+    # in the cache
+    if os.path.lexists(file):
+        os.remove(file)
+
+def fetch(directory, key, file):
+    # put the cached file for key at file and mark it used, returning False
+    # if there is none
+    path = get_path(directory, key)
+
+    try:
+        link_or_copy(path, file)
+        os.utime(path)
+    except FileNotFoundError:
+        # not cached, or evicted by another worker in the meantime
+        return False
+
+    return True
+
+def store(directory, key, file, max_size):
+    # add file to the cache under key, then evict the least recently used files
+    # until the cache holds at most max_size bytes
+    os.makedirs(directory, exist_ok=True)
+    temporary = get_path(directory, key) + "." + str(os.getpid())
+    link_or_copy(file, temporary)
+    os.replace(temporary, get_path(directory, key))
+    evict(directory, max_size)
+
+def evict(directory, max_size):
+    files = list()
+
+    for name in os.listdir(directory):
+        if not name.endswith(".cnf"):
+            continue
+
+        try:
+            status = os.stat(os.path.join(directory, name))
+        except FileNotFoundError:
+            continue
+
+        files.append((status.st_mtime, status.st_size, name))
+
+    size = sum(file[1] for file in files)
+
+    for mtime, file_size, name in sorted(files):
+        if size <= max_size:
+            break
+
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+
+        size -= file_size
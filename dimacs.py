@@ -0,0 +1,173 @@
+# Helpers for writing the DIMACS .cnf files produced by the HPsat programs and
+# pipelines, optionally compressed with gzip or xz.
+
+import io
+import os
+import gzip
+import lzma
+import shutil
+
+# suffix appended to a .cnf file name for each compression mode
+COMPRESSION_SUFFIXES = {None: "", "gz": ".gz", "xz": ".xz"}
+
+# default level for each compression mode. Level 1 gzip already shrinks a CNF
+# file by about 4x, and higher levels cost much more time than they save in size.
+DEFAULT_LEVELS = {"gz": 1, "xz": 1}
+
+# size of the chunks used to copy a prefix segment into a .cnf file or a solver
+COPY_SIZE = 1 << 20
+
+def check_compression(compression, level = None):
+    if compression not in COMPRESSION_SUFFIXES:
+        raise Exception("ERROR: unknown compression mode " + str(compression) + ", use gz or xz")
+
+    if level is not None and (level < 0 or level > 9):
+        raise Exception("ERROR: compression level must be between 0 and 9, got " + str(level))
+
+def cnf_path(file, compression = None):
+    # add the compression suffix to a .cnf file name, glucose and lingeling both
+    # use it to decide whether to decompress the input
+    check_compression(compression)
+
+    return file + COMPRESSION_SUFFIXES[compression]
+
+def probe_path(file, k):
+    # name of the .cnf file for one k out of several solved at the same time,
+    # with k before the .cnf so the compression suffix stays at the end
+    i = file.rfind(".cnf")
+
+    return file[:i] + "_" + str(k) + file[i:]
+
+def write_header(f, name, num_vars, num_clauses):
+    print("c " + name, file=f)
+    print("c", file=f)
+    print("p cnf " + str(num_vars) + " " + str(num_clauses), file=f)
+
+def write_dimacs(f, name, num_vars, num_clauses, conditions):
+    # write the header and the clauses of every condition to an open text stream
+    write_header(f, name, num_vars, num_clauses)
+    for c in conditions:
+        c.write_condition(f)
+
+def open_cnf(file, compression = None, level = None):
+    # open a .cnf file for writing in text mode, compressing it on the fly
+    check_compression(compression, level)
+
+    if compression is None:
+        return open(file, "w")
+
+    if level is None:
+        level = DEFAULT_LEVELS[compression]
+
+    if compression == "gz":
+        return gzip.open(file, "wt", compresslevel=level)
+    else:
+        return lzma.open(file, "wt", preset=level)
+
+def read_cnf(file, compression = None):
+    # open a file written by open_cnf for reading in text mode
+    check_compression(compression)
+
+    if compression is None:
+        return open(file, "r")
+    elif compression == "gz":
+        return gzip.open(file, "rt")
+    else:
+        return lzma.open(file, "rt")
+
+def encode(text, compression = None, level = None):
+    # Turn text into the bytes of a complete plain, gzip or xz stream. gzip
+    # members and xz streams can be concatenated, and the result decompresses to
+    # the concatenated text, so a .cnf file can be put together from pieces.
+    check_compression(compression, level)
+
+    if compression is None:
+        return text.encode()
+
+    if level is None:
+        level = DEFAULT_LEVELS[compression]
+
+    if compression == "gz":
+        return gzip.compress(text.encode(), compresslevel=level)
+    else:
+        return lzma.compress(text.encode(), preset=level)
+
+class CnfPrefix:
+    """
+    The conditions of a formula that don't depend on the goal number of contacts
+    (the embedding and contact conditions). Their clauses are written once, to
+    a segment file compressed the same way as the .cnf files, the first time a
+    .cnf file is built from them. Every .cnf file after that only needs a new
+    header, a copy of the segment, and the clauses of the conditions that do
+    depend on k. Without a file the segment is kept in memory instead, for
+    formulas that are streamed to the solver and never go to disk.
+    """
+    def __init__(self, conditions, file = None, compression = None, level = None):
+        self.conditions = conditions
+        self.file = file
+        self.compression = compression
+        self.level = level
+        self.num_clauses = sum(c.num_repeats * len(c) for c in conditions)
+        self.segment = None # the text of the segment if it's kept in memory
+        self.written = False
+
+    def write_segment(self):
+        if self.written:
+            return
+
+        if self.file is None:
+            segment = io.StringIO()
+
+            for c in self.conditions:
+                c.write_condition(segment)
+
+            self.segment = segment.getvalue()
+        else:
+            with open_cnf(self.file, self.compression, self.level) as f:
+                for c in self.conditions:
+                    c.write_condition(f)
+
+        self.written = True
+
+    def write_file(self, file, num_vars, num_clauses, conditions):
+        # write a complete .cnf file: the header, the segment, then conditions
+        self.write_segment()
+        header = io.StringIO()
+        body = io.StringIO()
+        write_header(header, file, num_vars, num_clauses)
+
+        for c in conditions:
+            c.write_condition(body)
+
+        with open(file, "wb") as out:
+            out.write(encode(header.getvalue(), self.compression, self.level))
+
+            if self.file is None:
+                out.write(encode(self.segment, self.compression, self.level))
+            else:
+                with open(self.file, "rb") as segment:
+                    shutil.copyfileobj(segment, out, COPY_SIZE)
+
+            out.write(encode(body.getvalue(), self.compression, self.level))
+
+    def write_stream(self, f, name, num_vars, num_clauses, conditions):
+        # same as write_file, but to an open text stream such as a solver's stdin
+        self.write_segment()
+        write_header(f, name, num_vars, num_clauses)
+
+        if self.file is None:
+            f.write(self.segment)
+        else:
+            with read_cnf(self.file, self.compression) as segment:
+                shutil.copyfileobj(segment, f, COPY_SIZE)
+
+        for c in conditions:
+            c.write_condition(f)
+
+    def close(self):
+        # remove the segment once no more formulas are built from it
+        if self.written and self.file is not None:
+            os.remove(self.file)
+
+        self.segment = None
+        self.written = False
@@ -0,0 +1,207 @@
+# Reachability-based domain pruning for the HPsat encodings in 2D and 3D. The
+# usual encoding gives every residue a variable for every cell of the grid. The
+# grid is a square or cube, so it maps onto itself under every rotation and
+# reflection, and any fold in it can be turned so that its middle residue m is
+# in the anchor cells: those whose coordinates go up along the axes, x <= y
+# (<= z), and are at most (w - 1) // 2, one wedge of the lower corner of the
+# grid. Residue i is then at most |i - m| steps from an anchor cell, and
+# |i - m| and the steps from any anchor cell it's in reach of have the same
+# parity, since the lattice is bipartite. So each residue only gets variables
+# for the cells of the usual grid it can reach, numbered one after the other,
+# and the at-most-one clauses only pair up cells and residues that can actually
+# meet. The pruned grid holds a turned copy of every fold the usual grid holds
+# and no other folds, so the maximum number of contacts doesn't change.
+#
+# Variables:
+#   X_ij: numbered from 1, residue by residue, in the order of the cells
+#   T_j: one for each cell some H residue can reach
+#   contact variables: one for each pair of neighbouring cells that both have
+#   a T_j variable
+
+from Condition import Condition
+import symmetry
+import lattice
+
+class Domains:
+    """
+    The cells of a grid grid_width cells wide each residue of a sequence of
+    length n can reach with the middle residue in one of the anchor cells, and
+    the variables of the pruned encoding on that grid. Cells are numbered from
+    1 with x changing fastest, like the usual grids.
+    """
+    def __init__(self, n, grid_width, dimension, positions_of_ones):
+        self.n = n
+        self.dimension = dimension
+        self.positions_of_ones = positions_of_ones
+        self.anchor = (n - 1) // 2
+        self.width = grid_width
+        num_cells = pow(grid_width, dimension)
+        self.anchor_cells = [j for j in range(1, num_cells + 1) if self.is_anchor_cell(j)]
+
+        # steps to every cell from the nearest anchor cell of each parity
+        distances = [self.get_distances([j for j in self.anchor_cells if self.get_parity(j) == parity]) for parity in (0, 1)]
+        self.x_vars = list() # cell -> X_ij variable for every residue i
+        num_vars = 0
+
+        for i in range(0, n):
+            steps = abs(i - self.anchor)
+            x_vars = dict()
+
+            for j in range(1, num_cells + 1):
+                # the anchor cells steps away from j have the parity of j, plus
+                # one if steps is odd
+                distance = distances[(self.get_parity(j) + steps) % 2][j]
+
+                if distance is not None and distance <= steps:
+                    num_vars += 1
+                    x_vars[j] = num_vars
+
+            self.x_vars.append(x_vars)
+
+        self.t_vars = dict()
+
+        for j in sorted(set(j for i in positions_of_ones for j in self.x_vars[i])):
+            num_vars += 1
+            self.t_vars[j] = num_vars
+
+        self.edges = list()
+
+        for j in self.t_vars:
+            for k in self.get_neighbours(j, 1):
+                if k in self.t_vars:
+                    self.edges.append((j, k))
+
+        self.contact_offset = num_vars
+
+    def is_anchor_cell(self, cell):
+        coordinates = symmetry.get_coordinates(cell, self.width, self.dimension)
+
+        return coordinates == sorted(coordinates) and coordinates[-1] <= (self.width - 1) // 2
+
+    def get_parity(self, cell):
+        return sum(symmetry.get_coordinates(cell, self.width, self.dimension)) % 2
+
+    def get_distances(self, cells):
+        # steps from the nearest of cells to every cell, by cell number, or None
+        # if cells is empty
+        distances = [None] * (pow(self.width, self.dimension) + 1)
+        frontier = list(cells)
+
+        for j in frontier:
+            distances[j] = 0
+
+        while len(frontier) > 0:
+            next_frontier = list()
+
+            for j in frontier:
+                for k in self.get_neighbours(j):
+                    if distances[k] is None:
+                        distances[k] = distances[j] + 1
+                        next_frontier.append(k)
+
+            frontier = next_frontier
+
+        return distances
+
+    def get_neighbours(self, cell, sign = None):
+        # neighbouring cells in the grid, only those further along each axis if
+        # sign is 1
+        grid = lattice.get_lattice(self.width, self.dimension)
+
+        if sign is None:
+            return grid.neighbours[cell]
+
+        return [k for k in grid.forward[cell] if k is not None]
+
+    def get_num_x_vars(self):
+        return sum(len(x_vars) for x_vars in self.x_vars)
+
+    def get_contact_vars(self):
+        # the variable before the first contact variable and the number of them
+        return list([self.contact_offset, len(self.edges)])
+
+    def gen_embedding_conditions(self):
+        embedding_conditions = list()
+
+        # embedding condition 1 (every residue is somewhere)
+        embed_condition_1 = Condition([list(x_vars.values()) for x_vars in self.x_vars])
+        embedding_conditions.append(embed_condition_1)
+
+        # embedding condition 2 (every residue is in only one cell)
+        embed_condition_2 = Condition(list())
+
+        for x_vars in self.x_vars:
+            cells = list(x_vars.values())
+
+            for a in range(0, len(cells) - 1):
+                for b in range(a + 1, len(cells)):
+                    embed_condition_2.add_clause([-1 * cells[a], -1 * cells[b]])
+
+        embedding_conditions.append(embed_condition_2)
+
+        # embedding condition 3 (every cell holds only one residue)
+        embed_condition_3 = Condition(list())
+        residues = dict()
+
+        for x_vars in self.x_vars:
+            for j in x_vars:
+                residues.setdefault(j, list()).append(x_vars[j])
+
+        for j in sorted(residues):
+            for a in range(0, len(residues[j]) - 1):
+                for b in range(a + 1, len(residues[j])):
+                    embed_condition_3.add_clause([-1 * residues[j][a], -1 * residues[j][b]])
+
+        embedding_conditions.append(embed_condition_3)
+
+        # embedding condition 4 (the next residue is in a neighbouring cell)
+        embed_condition_4 = Condition(list())
+
+        for i in range(0, self.n - 1):
+            for j in self.x_vars[i]:
+                clause = [-1 * self.x_vars[i][j]]
+                clause.extend(self.x_vars[i + 1][k] for k in self.get_neighbours(j) if k in self.x_vars[i + 1])
+                embed_condition_4.add_clause(clause)
+
+        embedding_conditions.append(embed_condition_4)
+
+        return embedding_conditions
+
+    def gen_contact_conditions(self):
+        contact_conditions = list()
+
+        # contact condition 1 (T_j is true exactly when an H residue is in cell j)
+        contact_condition_1 = Condition(list())
+
+        for j in self.t_vars:
+            h_vars = [self.x_vars[i][j] for i in self.positions_of_ones if j in self.x_vars[i]]
+
+            for x in h_vars:
+                contact_condition_1.add_clause([self.t_vars[j], -1 * x])
+
+            contact_condition_1.add_clause([-1 * self.t_vars[j]] + h_vars)
+
+        contact_conditions.append(contact_condition_1)
+
+        # contact condition 2 (a contact variable is true exactly when both of
+        # its cells hold an H residue)
+        contact_condition_2 = Condition(list())
+
+        for e in range(0, len(self.edges)):
+            C_e = self.contact_offset + e + 1
+            T_j = self.t_vars[self.edges[e][0]]
+            T_k = self.t_vars[self.edges[e][1]]
+            contact_condition_2.add_clause([-1 * C_e, T_j])
+            contact_condition_2.add_clause([-1 * C_e, T_k])
+            contact_condition_2.add_clause([C_e, -1 * T_j, -1 * T_k])
+
+        contact_conditions.append(contact_condition_2)
+
+        return contact_conditions
+
+    def gen_symmetry_conditions(self):
+        # The anchor cells already use up the rotations and reflections of the
+        # grid, and a fold turned into them can't always also be moved against
+        # the first planes of the grid, so the pruned grid takes no symmetry
+        # breaking clauses of its own.
+        return list()
@@ -0,0 +1,250 @@
+# Heuristic folding of HP sequences on the square and cubic lattices. A fold
+# is found by growing the chain one residue at a time, each into the free
+# neighbouring cell that makes the most new contacts, and is then improved by
+# simulated annealing over pull moves, pivot moves (turning the rest of the
+# chain about one residue by a rotation or reflection of the lattice), corner
+# flips and end moves. Every fold stays inside a box grid_width cells wide, so
+# it fits in the grid the pipelines solve on and its contacts are a lower
+# bound on the maximum there.
+#
+# A fold is a list of coordinate tuples, one per residue. A contact is the k
+# of the pipelines: two H residues on neighbouring cells that aren't next to
+# each other in the chain.
+
+import math
+import random
+import itertools
+
+def get_directions(dimension):
+    # unit steps along every axis, +x, -x, +y, -y, ...
+    directions = list()
+
+    for axis in range(0, dimension):
+        for sign in [1, -1]:
+            step = [0] * dimension
+            step[axis] = sign
+            directions.append(tuple(step))
+
+    return directions
+
+def get_symmetries(dimension):
+    # the rotations and reflections of the lattice other than the identity, as
+    # (permutation of the axes, signs) pairs
+    symmetries = list()
+
+    for permutation in itertools.permutations(range(0, dimension)):
+        for signs in itertools.product([1, -1], repeat=dimension):
+            if permutation != tuple(range(0, dimension)) or -1 in signs:
+                symmetries.append((permutation, signs))
+
+    return symmetries
+
+def add(a, b):
+    return tuple(x + y for x, y in zip(a, b))
+
+def count_contacts(fold, string):
+    # the number of pairs of H residues on neighbouring cells, at least 3 apart
+    # in the chain
+    residues = dict((fold[i], i) for i in range(0, len(fold)))
+    directions = get_directions(len(fold[0]))
+    contacts = 0
+
+    for i in range(0, len(fold)):
+        if string[i] != "1":
+            continue
+
+        for step in directions:
+            j = residues.get(add(fold[i], step))
+
+            if j is not None and j > i + 2 and string[j] == "1":
+                contacts += 1
+
+    return contacts
+
+def is_valid(fold, grid_width):
+    # the fold is self-avoiding, connected and fits in a box grid_width cells
+    # wide
+    if len(set(fold)) != len(fold):
+        return False
+
+    for i in range(0, len(fold) - 1):
+        if sum(abs(x - y) for x, y in zip(fold[i], fold[i + 1])) != 1:
+            return False
+
+    for axis in range(0, len(fold[0])):
+        coordinates = [cell[axis] for cell in fold]
+
+        if max(coordinates) - min(coordinates) >= grid_width:
+            return False
+
+    return True
+
+def grow_fold(string, dimension, grid_width, rng, attempts = 100):
+    # grow the chain greedily, breaking ties at random, and start over if it
+    # runs into a dead end
+    directions = get_directions(dimension)
+    origin = tuple([0] * dimension)
+
+    for attempt in range(0, attempts):
+        fold = [origin]
+        residues = {origin: 0}
+        low = list(origin)
+        high = list(origin)
+
+        for i in range(1, len(string)):
+            candidates = list()
+
+            for step in directions:
+                cell = add(fold[i - 1], step)
+
+                if cell in residues:
+                    continue
+                if any(max(high[axis], cell[axis]) - min(low[axis], cell[axis]) >= grid_width for axis in range(0, dimension)):
+                    continue
+
+                # new contacts, then free cells around it to keep the chain
+                # out of dead ends
+                contacts = 0
+                free = 0
+
+                for next_step in directions:
+                    j = residues.get(add(cell, next_step))
+
+                    if j is None:
+                        free += 1
+                    elif string[i] == "1" and j < i - 1 and string[j] == "1":
+                        contacts += 1
+
+                candidates.append((contacts, free > 0 or i == len(string) - 1, rng.random(), cell))
+
+            if len(candidates) == 0:
+                break
+
+            cell = max(candidates)[3]
+            fold.append(cell)
+            residues[cell] = i
+
+            for axis in range(0, dimension):
+                low[axis] = min(low[axis], cell[axis])
+                high[axis] = max(high[axis], cell[axis])
+
+        if len(fold) == len(string):
+            return fold
+
+    return None
+
+def pivot_move(fold, dimension, rng, symmetries):
+    # turn the residues after (or before) a random one about it
+    i = rng.randrange(0, len(fold))
+    permutation, signs = rng.choice(symmetries)
+    moved = list(fold)
+    residues = range(i + 1, len(fold)) if rng.random() < 0.5 else range(0, i)
+
+    for j in residues:
+        offset = [fold[j][axis] - fold[i][axis] for axis in range(0, dimension)]
+        moved[j] = tuple(fold[i][axis] + signs[axis] * offset[permutation[axis]] for axis in range(0, dimension))
+
+    return moved
+
+def pull_move(fold, dimension, rng, directions):
+    # Lesh's pull move: residue i goes to a free cell L next to residue i + 1
+    # and diagonal to i, residue i - 1 to the cell C next to both L and i, and
+    # each residue before that to the cell two along the chain from it, until
+    # the chain is connected again. Pulling the other way works the same on
+    # the reversed chain.
+    reverse = rng.random() < 0.5
+
+    if reverse:
+        fold = fold[::-1]
+
+    i = rng.randrange(0, len(fold) - 1)
+    bond = tuple(x - y for x, y in zip(fold[i], fold[i + 1]))
+    step = rng.choice([step for step in directions if step != bond and step != tuple(-1 * x for x in bond)])
+    L = add(fold[i + 1], step)
+    C = add(L, bond)
+    occupied = set(fold)
+
+    if L in occupied or (C in occupied and (i == 0 or C != fold[i - 1])):
+        return None
+
+    moved = list(fold)
+    moved[i] = L
+
+    if i > 0 and C != fold[i - 1]:
+        moved[i - 1] = C
+        j = i - 2
+
+        while j >= 0 and sum(abs(x - y) for x, y in zip(fold[j], moved[j + 1])) != 1:
+            moved[j] = fold[j + 2]
+            j -= 1
+
+    return moved[::-1] if reverse else moved
+
+def local_move(fold, dimension, rng, directions):
+    # move one residue to another cell next to both of its neighbours in the
+    # chain (a corner flip), or an end of the chain to another cell next to
+    # the residue after it
+    i = rng.randrange(0, len(fold))
+    chain_neighbours = [fold[j] for j in [i - 1, i + 1] if 0 <= j < len(fold)]
+    cells = list()
+
+    for step in directions:
+        cell = add(chain_neighbours[0], step)
+
+        if cell != fold[i] and all(sum(abs(x - y) for x, y in zip(cell, other)) == 1 for other in chain_neighbours):
+            cells.append(cell)
+
+    if len(cells) == 0:
+        return None
+
+    moved = list(fold)
+    moved[i] = rng.choice(cells)
+
+    return moved
+
+def fold_sequence(string, dimension, grid_width, iterations = None, seed = 0):
+    # a fold of the string inside a box grid_width cells wide with as many
+    # contacts as the search finds, and the number of them, as list([fold,
+    # contacts]). The fold is None if the chain can't be grown in the box.
+    rng = random.Random(seed)
+    fold = grow_fold(string, dimension, grid_width, rng)
+
+    if fold is None:
+        return list([None, 0])
+
+    if iterations is None:
+        iterations = 500 * len(string)
+
+    directions = get_directions(dimension)
+    symmetries = get_symmetries(dimension)
+    contacts = count_contacts(fold, string)
+    best_fold = fold
+    best_contacts = contacts
+
+    for iteration in range(0, iterations):
+        # cool down geometrically from 1 to 0.05 over the run
+        temperature = pow(0.05, iteration / iterations)
+
+        move = rng.random()
+
+        if move < 0.1:
+            moved = pivot_move(fold, dimension, rng, symmetries)
+        elif move < 0.2:
+            moved = local_move(fold, dimension, rng, directions)
+        else:
+            moved = pull_move(fold, dimension, rng, directions)
+
+        if moved is None or not is_valid(moved, grid_width):
+            continue
+
+        moved_contacts = count_contacts(moved, string)
+
+        if moved_contacts >= contacts or rng.random() < math.exp((moved_contacts - contacts) / temperature):
+            fold = moved
+            contacts = moved_contacts
+
+            if contacts > best_contacts:
+                best_fold = fold
+                best_contacts = contacts
+
+    return list([best_fold, best_contacts])
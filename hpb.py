@@ -0,0 +1,128 @@
+# Python port of the perl ILP generators HPb.pl and HPb1.pl for the 2D HP
+# model, so the 2D pipeline writes the ILP of each sequence in-process instead
+# of starting perl for it. HPb.pl places the sequence on an n by n grid with A
+# variables, and HPb1.pl on a grid 1 + n // 4 wide with X variables. Otherwise
+# the two are the same, and the files written here match theirs byte for byte.
+# The neighbours and edges of the points come from the same tables as the SAT
+# encodings.
+#
+# Variables (points of the grid numbered from 1 row by row):
+#   A_i,p or X_i,p: residue i (from 1) at point p
+#   I_p: an H residue at point p
+#   C_p,q: a contact between the neighbouring points p and q
+
+import lattice
+
+FORMULATIONS = ["HPb", "HPb1"]
+
+def get_formulation(n):
+    # the generator the 2D pipeline has always used for a sequence of length n
+    return "HPb1" if n >= 12 else "HPb"
+
+def get_grid_width(n, formulation):
+    if formulation == "HPb":
+        return n
+
+    return 1 + n // 4
+
+def get_points(grid_width):
+    # the points that aren't corners in the order the perl generators list
+    # their neighbour constraints: the middle of the grid row by row, then the
+    # first row, the last row, the first column and the last column
+    inner = range(1, grid_width - 1)
+    middle = [row * grid_width + column + 1 for row in inner for column in inner]
+    border = [column + 1 for column in inner]
+    border += [(grid_width - 1) * grid_width + column + 1 for column in inner]
+    border += [row * grid_width + 1 for row in inner]
+    border += [(row + 1) * grid_width for row in inner]
+
+    return list([middle, border])
+
+def count_neighbours(string):
+    # the pairs of neighbouring H residues in the chain, which are adjacent in
+    # every fold and so are taken off the objective
+    return sum(1 for i in range(1, len(string)) if string[i - 1] == "1" and string[i] == "1")
+
+def get_neighbour_template(p, neighbours, end):
+    # residue i at p means residue i + 1 is at one of the neighbours of p, with
+    # the names of the variables of residues i and i + 1 left out
+    return "%s" + str(p) + " " + " ".join("- %s" + str(q) for q in neighbours) + end
+
+def write_lp(string, out, formulation):
+    # write the ILP for string to the text stream out a section at a time
+    n = len(string)
+    grid_width = get_grid_width(n, formulation)
+    grid = lattice.get_lattice(grid_width, 2)
+    num_points = grid.num_cells
+    x = "A" if formulation == "HPb" else "X"
+    names = [x + str(i) + "," for i in range(0, n + 1)] # variable names of each residue, up to the point
+
+    out.write("Maximize\n")
+
+    # one C variable for every edge, horizontal edges first at each point
+    out.write("".join(("+  C" if q == p + 1 else "+ C") + str(p) + "," + str(q) + " " for p, q in grid.edges))
+
+    out.write(" - Offset \n")
+
+    if formulation == "HPb":
+        out.write("  \n\n")
+
+    out.write("subject to \n")
+    out.write("Offset = " + str(count_neighbours(string)) + " \n")
+
+    # every residue is at one point
+    for i in range(1, n + 1):
+        out.write("".join("+ " + names[i] + str(p) + " " for p in range(1, num_points + 1)) + "=  1 \n")
+
+    # every point holds at most one residue
+    for p in range(1, num_points + 1):
+        out.write("".join("+ " + names[i] + str(p) + " " for i in range(1, n + 1)) + "<=  1 \n")
+
+    # residue i + 1 is at a neighbour of the point of residue i, the middle of
+    # the grid and then its border, and then the corners
+    middle, border = get_points(grid_width)
+
+    for points, end in ((middle, " <= 0\n"), (border, "  <= 0\n")):
+        for p in points:
+            template = get_neighbour_template(p, grid.neighbours[p], end)
+            num_names = len(grid.neighbours[p])
+            out.write("".join(template % ((names[i],) + (names[i + 1],) * num_names) for i in range(1, n)))
+
+    if grid_width > 1:
+        corners = [1, grid_width, grid_width * (grid_width - 1) + 1, num_points]
+        templates = [get_neighbour_template(p, grid.neighbours[p], "  <= 0\n") for p in corners]
+
+        for i in range(1, n):
+            for template in templates:
+                out.write(template % (names[i], names[i + 1], names[i + 1]))
+
+    # I_p is true exactly when an H residue is at p
+    ones = [i + 1 for i in range(0, n) if string[i] == "1"]
+
+    for p in range(1, num_points + 1):
+        out.write("".join("+ " + names[i] + str(p) + " " for i in ones) + " - I" + str(p) + " = 0 \n")
+
+    out.write(" \n\n")
+
+    # C can be set to 1 only if both endpoints are assigned 1s
+    out.write("".join("I" + str(p) + " + I" + str(q) + " - 2 C" + str(p) + "," + str(q) + " >= 0\n" for p, q in grid.edges))
+    out.write(" \n\n")
+    out.write("binary \n")
+    out.write("".join("C" + str(p) + "," + str(q) + "\n" for p, q in grid.edges))
+
+    for i in range(1, n + 1):
+        out.write("".join(names[i] + str(p) + "\n" for p in range(1, num_points + 1)))
+
+    out.write("".join("I" + str(p) + " \n" for p in range(1, num_points + 1)))
+
+    out.write(" \n")
+    out.write("end")
+
+def write_lp_file(string, lp_file, formulation = None):
+    # write the ILP for string to lp_file with the generator the pipeline uses
+    # for its length, or the one given
+    if formulation is None:
+        formulation = get_formulation(len(string))
+
+    with open(lp_file, "w", 1 << 20) as out:
+        write_lp(string, out, formulation)
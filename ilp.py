@@ -0,0 +1,189 @@
+# Runs the ILP solvers the pipelines compare the SAT solvers with on the .lp
+# files written by the HPb generators. Gurobi needs a license, so the same
+# files can also be solved with the open source MIP solvers HiGHS and CBC. Each
+# solver writes its solution file in a format of its own, and they are all read
+# back as the objective value and the value of every variable, so the pipelines
+# don't depend on which solver ran. A solve can be given a start, values of the
+# variables of a known solution, which every solver reads in a format of its
+# own, and a cutoff below which Gurobi ignores solutions.
+
+import os
+import re
+import time
+import subprocess
+
+ILP_SOLVERS = ["gurobi", "highs", "cbc"]
+SOLVER_NAMES = {"gurobi": "Gurobi", "highs": "HiGHS", "cbc": "CBC"}
+
+def check_solver(solver):
+    if solver not in ILP_SOLVERS:
+        raise Exception("ERROR: unknown ILP solver " + solver + ", expected one of " + ", ".join(ILP_SOLVERS))
+
+def get_command(solver, lp_file, sol_file, threads = None, time_limit = None, start_file = None, cutoff = None):
+    # the command solving lp_file with solver and writing its solution to
+    # sol_file, limited to threads threads and time_limit seconds if they're
+    # set, and starting from the solution in start_file if it's given. Only
+    # Gurobi is given the cutoff: the objective bound of highs doesn't cut off
+    # a maximization, and cbc takes its cutoff in the minimization sense.
+    if solver == "gurobi":
+        command = ["gurobi_cl", "ResultFile=" + sol_file]
+
+        if threads is not None:
+            command.append("Threads=" + str(threads))
+
+        if time_limit is not None:
+            command.append("TimeLimit=" + str(time_limit))
+
+        if start_file is not None:
+            command.append("InputFile=" + start_file)
+
+        if cutoff is not None:
+            command.append("Cutoff=" + str(cutoff))
+
+        return command + [lp_file]
+
+    if solver == "highs":
+        command = ["highs", "--model_file", lp_file, "--solution_file", sol_file]
+
+        if start_file is not None:
+            command += ["--read_solution_file", start_file]
+
+        # the highs command line has no thread option, only an options file
+        if threads is not None:
+            options_file = sol_file + ".options"
+
+            with open(options_file, "w") as f:
+                f.write("threads = " + str(threads) + "\n")
+
+            command += ["--options_file", options_file]
+
+        if time_limit is not None:
+            command += ["--time_limit", str(time_limit)]
+
+        return command
+
+    # cbc runs its arguments as commands in order, so the limits go before solve
+    command = ["cbc", lp_file]
+
+    if threads is not None:
+        command += ["threads", str(threads)]
+
+    if time_limit is not None:
+        command += ["sec", str(time_limit)]
+
+    if start_file is not None:
+        command += ["mips", start_file]
+
+    return command + ["solve", "solu", sol_file]
+
+def write_start(solver, start_file, start):
+    # write start, a dict of variable values, to start_file in the format
+    # solver reads starts in
+    with open(start_file, "w") as f:
+        if solver == "gurobi":
+            f.write("# MIP start\n")
+            f.write("".join(name + " " + str(start[name]) + "\n" for name in start))
+        elif solver == "highs":
+            # a highs solution file, which has to list every variable
+            f.write("Model status\nUnknown\n\n# Primal solution values\nFeasible\nObjective 0\n")
+            f.write("# Columns " + str(len(start)) + "\n")
+            f.write("".join(name + " " + str(start[name]) + "\n" for name in start))
+            f.write("# Rows 0\n")
+        else:
+            # a cbc solution file, of which only the lines starting with an
+            # index are read
+            f.write("Feasible - objective value 0\n")
+            f.write("".join(str(index) + " " + name + " " + str(start[name]) + " 0\n" for index, name in enumerate(start)))
+
+def read_gurobi_solution(lines):
+    # "# Objective value = 12" and then one "name value" line per variable
+    objective = None
+    values = dict()
+
+    for line in lines:
+        if line.startswith("#"):
+            if "Objective value =" in line:
+                objective = float(line.split("=")[1])
+        elif len(line.split()) == 2:
+            name, value = line.split()
+            values[name] = float(value)
+
+    return list([objective, values])
+
+def read_highs_solution(lines):
+    # "Objective 12" in the primal solution, then "# Columns <count>" and one
+    # "name value" line per variable until "# Rows"
+    objective = None
+    values = dict()
+    columns = False
+
+    for line in lines:
+        if line.startswith("Objective") and objective is None:
+            objective = float(re.split(r"[\s:]+", line.strip())[-1])
+        elif line.startswith("# Columns"):
+            columns = True
+        elif line.startswith("#"):
+            columns = False
+        elif columns and len(line.split()) == 2:
+            name, value = line.split()
+            values[name] = float(value)
+
+    return list([objective, values])
+
+def read_cbc_solution(lines):
+    # "Optimal - objective value 12.00000000" (or the reason cbc stopped), then
+    # one "index name value reduced cost" line per variable, with "**" in front
+    # of values that break a bound
+    objective = None
+    values = dict()
+
+    if len(lines) == 0 or lines[0].startswith("Infeasible") or "objective value" not in lines[0]:
+        return list([objective, values])
+
+    objective = float(lines[0].split("objective value")[1])
+
+    for line in lines[1:]:
+        fields = line.replace("**", "").split()
+
+        if len(fields) >= 3:
+            values[fields[1]] = float(fields[2])
+
+    return list([objective, values])
+
+def read_solution(solver, sol_file):
+    # the objective value and a dict of the variable values in sol_file, or
+    # None and an empty dict if the solver found no solution
+    if not os.path.exists(sol_file):
+        return list([None, dict()])
+
+    with open(sol_file) as f:
+        lines = f.readlines()
+
+    if solver == "gurobi":
+        return read_gurobi_solution(lines)
+
+    if solver == "highs":
+        return read_highs_solution(lines)
+
+    return read_cbc_solution(lines)
+
+def solve(solver, lp_file, sol_file, threads = None, time_limit = None, start = None, cutoff = None):
+    # Solve lp_file with solver, starting from the variable values in start if
+    # it's given. Returns the CompletedProcess of the run, the objective value
+    # (None if no solution was found), the variable values and the wall time of
+    # the run.
+    if os.path.exists(sol_file):
+        os.remove(sol_file) # so a solution left by an earlier run isn't read back
+
+    start_file = None
+
+    if start is not None:
+        start_file = sol_file + ".mst" # gurobi tells a start by the extension
+        write_start(solver, start_file, start)
+
+    start_time = time.time()
+    result = subprocess.run(get_command(solver, lp_file, sol_file, threads, time_limit, start_file, cutoff), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    end = time.time()
+    objective, values = read_solution(solver, sol_file)
+
+    return list([result, objective, values, end - start_time])
@@ -0,0 +1,101 @@
+# Incremental solving for the pipelines. Instead of writing a new .cnf file and
+# starting a new solver process for every k, the formula is loaded once into an
+# in-process solver from PySAT (pip install python-sat) and every k is solved
+# under an assumption on an output bit of the counting tree, so the clauses the
+# solver learns while testing one k are kept for the next.
+
+import subprocess
+
+try:
+    from pysat.solvers import Solver
+except ImportError:
+    Solver = None
+
+def check_solver(solver_name):
+    if Solver is None:
+        raise Exception("ERROR: incremental solving needs PySAT, install it with pip install python-sat")
+
+    try:
+        Solver(name=solver_name).delete()
+    except NotImplementedError:
+        raise Exception("ERROR: unknown PySAT solver " + str(solver_name))
+
+class IncrementalFormula:
+    """
+    A formula whose counting tree is built once, for the largest number of
+    non-contacts r any k can ask for, without the clauses at its root that bound
+    the count by r. Node variables num_existing_vars + i (left child of the
+    root) and num_existing_vars + root_width + j (right child) mean at least i
+    or j of the contact variables below them are false.
+
+    Testing a k adds an output bit o for r + 1, implied by every pair of
+    children values adding up to r + 1, and solves under the assumption -o,
+    so the count is at most r. The implications stay true for every r, so the
+    solver keeps them and everything learned from them between probes.
+    """
+    def __init__(self, conditions, num_vars, num_existing_vars, root_width, solver_name):
+        check_solver(solver_name)
+        self.conditions = conditions
+        self.num_vars = num_vars
+        self.num_existing_vars = num_existing_vars
+        self.root_width = root_width
+        self.solver_name = solver_name
+        self.solver = None
+        self.outputs = dict() # output variable for each count r + 1 tested so far
+
+    def load(self):
+        # the formula is only given to the solver on the first probe, so its
+        # parse time is counted as part of the solver time like a file is
+        if self.solver is None:
+            self.solver = Solver(name=self.solver_name)
+
+            for c in self.conditions:
+                self.solver.append_formula(c.iter_repeated())
+
+    def get_output(self, count):
+        # output variable that is true if at least count contact variables are false
+        if count not in self.outputs:
+            self.num_vars += 1
+            output = self.num_vars
+            left = self.num_existing_vars
+            right = self.num_existing_vars + self.root_width
+
+            for i in range(max(0, count - self.root_width), min(count, self.root_width) + 1):
+                j = count - i
+                clause = list()
+
+                if i > 0:
+                    clause.append(-1 * (left + i))
+                if j > 0:
+                    clause.append(-1 * (right + j))
+
+                clause.append(output)
+                self.solver.add_clause(clause)
+
+            self.outputs[count] = output
+
+        return self.outputs[count]
+
+    def solve(self, r):
+        # solve with at most r contact variables false. Returns a CompletedProcess
+        # with the return code a SAT solver would exit with, 10 for SAT and 20 for UNSAT
+        if r < 0:
+            return subprocess.CompletedProcess([self.solver_name], 20, None, None)
+
+        self.load()
+
+        satisfiable = self.solver.solve(assumptions=[-1 * self.get_output(r + 1)])
+
+        if satisfiable is None:
+            return subprocess.CompletedProcess([self.solver_name], 0, None, "ERROR: " + self.solver_name + " gave no answer")
+
+        return subprocess.CompletedProcess([self.solver_name], 10 if satisfiable else 20, None, None)
+
+    def get_model(self):
+        # the values of the variables after the last SAT answer
+        return self.solver.get_model() or list()
+
+    def close(self):
+        if self.solver is not None:
+            self.solver.delete()
+            self.solver = None
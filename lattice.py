@@ -0,0 +1,145 @@
+# The square and cubic grids the HPsat encodings place residues on, and the
+# embedding and contact conditions built on them, shared by the 2D and 3D
+# generators and pipelines. Cells are numbered from 1 with x changing fastest.
+# The neighbours of every cell and the edges between cells are worked out once
+# for each grid width and dimension and kept in tables, so building the
+# conditions is a walk over the tables rather than a case analysis of where a
+# cell sits on the border of the grid for every cell.
+#
+# The neighbours of a cell are listed in the order +x, -x, +y, -y, +z, -z,
+# leaving out the ones outside the grid, and the edges in order of their first
+# cell and then of the axis the second cell is along.
+#
+# Variables of the usual encoding:
+#   X_ij: i * cells + j, residue i (from 0) in cell j (from 1)
+#   T_j: n * cells + j, an H residue in cell j
+#   contact variable for cell j along axis a: n * cells + (a + 1) * cells + j
+
+import functools
+from array import array
+from Condition import Condition
+import symmetry
+
+class Lattice:
+    """
+    The cells of a grid grid_width cells wide in every dimension, with the
+    neighbours of each cell, the next cell along each axis (None on the far
+    border) and the edges between neighbouring cells.
+    """
+    def __init__(self, grid_width, dimension):
+        self.grid_width = grid_width
+        self.dimension = dimension
+        self.num_cells = pow(grid_width, dimension)
+        self.neighbours = [None] # neighbours[j] for cells j from 1
+        self.forward = [None] # forward[j][axis] is the next cell along axis
+        self.edges = list()
+
+        for j in range(1, self.num_cells + 1):
+            coordinates = symmetry.get_coordinates(j, grid_width, dimension)
+            neighbours = list()
+            forward = list()
+
+            for axis in range(0, dimension):
+                stride = pow(grid_width, axis)
+
+                if coordinates[axis] < grid_width - 1:
+                    neighbours.append(j + stride)
+                    forward.append(j + stride)
+                    self.edges.append((j, j + stride))
+                else:
+                    forward.append(None)
+
+                if coordinates[axis] > 0:
+                    neighbours.append(j - stride)
+
+            self.neighbours.append(neighbours)
+            self.forward.append(forward)
+
+@functools.lru_cache(maxsize=None)
+def get_lattice(grid_width, dimension):
+    return Lattice(grid_width, dimension)
+
+def get_pairs(variables):
+    # the literals of the clauses [-a, -b] for every pair of variables a before
+    # b, one after the other, filled in a slice at a time
+    num_variables = len(variables)
+    negated = array("i", [-1 * x for x in variables])
+    literals = array("i", bytes(4 * num_variables * (num_variables - 1)))
+    start = 0
+
+    for a in range(0, num_variables - 1):
+        num_pairs = num_variables - a - 1
+        end = start + 2 * num_pairs
+        literals[start:end:2] = array("i", [negated[a]]) * num_pairs
+        literals[start + 1:end:2] = negated[a + 1:]
+        start = end
+
+    return literals
+
+def gen_embedding_conditions(n, grid_width, dimension):
+    lattice = get_lattice(grid_width, dimension)
+    num_cells = lattice.num_cells
+    embedding_conditions = list()
+
+    # embedding condition 1 (every residue is somewhere)
+    embed_condition_1 = Condition([range(1, num_cells + 1)], True, n, num_cells)
+    embedding_conditions.append(embed_condition_1)
+
+    # embedding condition 2 (every residue is in only one cell)
+    embed_condition_2 = Condition(list(), True, n, num_cells)
+    embed_condition_2.add_clauses(get_pairs(range(1, num_cells + 1)), 2)
+    embedding_conditions.append(embed_condition_2)
+
+    # embedding condition 3 (every cell holds only one residue)
+    embed_condition_3 = Condition(list(), True, num_cells, 1)
+    embed_condition_3.add_clauses(get_pairs(range(1, (n - 1) * num_cells + 2, num_cells)), 2)
+    embedding_conditions.append(embed_condition_3)
+
+    # embedding condition 4 (the next residue is in a neighbouring cell)
+    embed_condition_4 = Condition(list(), True, n - 1, num_cells)
+
+    for j in range(1, num_cells + 1):
+        embed_condition_4.add_clause([-1 * j] + [k + num_cells for k in lattice.neighbours[j]])
+
+    embedding_conditions.append(embed_condition_4)
+
+    return embedding_conditions
+
+def gen_contact_conditions(n, grid_width, dimension, positions_of_ones):
+    lattice = get_lattice(grid_width, dimension)
+    num_cells = lattice.num_cells
+    offset = num_cells * n # existing vars from X_ij conditions
+    contact_conditions = list()
+
+    # contact condition 1 (T_j is true exactly when an H residue is in cell j),
+    # repeated for every cell
+    contact_condition_1 = Condition(list(), True, num_cells, 1)
+
+    for x in positions_of_ones:
+        contact_condition_1.add_clause([offset + 1, -1 * (x * num_cells + 1)])
+
+    contact_condition_1.add_clause([-1 * (offset + 1)] + [x * num_cells + 1 for x in positions_of_ones])
+    contact_conditions.append(contact_condition_1)
+
+    # contact condition 2 (a contact variable is true exactly when both of its
+    # cells hold an H residue, and false if the next cell is off the grid)
+    contact_condition_2 = Condition(list())
+
+    for j in range(1, num_cells + 1):
+        T_j = offset + j
+
+        for axis in range(0, dimension):
+            C_j = offset + (axis + 1) * num_cells + j
+            k = lattice.forward[j][axis]
+
+            if k is None:
+                contact_condition_2.add_clause([-1 * C_j])
+            else:
+                T_k = offset + k
+                contact_condition_2.add_clause([-1 * C_j, T_j])
+                contact_condition_2.add_clause([-1 * C_j, T_k])
+                contact_condition_2.add_clause([C_j, -1 * T_j, -1 * T_k])
+
+    contact_conditions.append(contact_condition_2)
+
+    return contact_conditions
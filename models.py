@@ -0,0 +1,102 @@
+# Reading folds back out of the models SAT solvers print for the HPsat
+# formulas. A solver that finds a formula SAT prints the values of its
+# variables on "v" lines (glucose-syrup only with -model), and the X_ij
+# variables among them place every residue i in a cell j of the grid, which
+# gives the fold as coordinates. The fold can hold more contacts than the k the
+# formula asked for, so the pipelines use its count to skip ahead. A fold can
+# also be written as values of the variables of the ILPs, to start the ILP
+# solver from it.
+
+import symmetry
+import folding
+import domains
+import lattice
+
+def parse_model(output):
+    # the literals on the "v" lines of a solver's output, as a list of ints
+    if output is None:
+        return list()
+
+    if isinstance(output, bytes):
+        output = output.decode(errors="replace")
+
+    model = list()
+
+    for line in output.splitlines():
+        if line.startswith("v"):
+            model.extend(int(x) for x in line[1:].split() if x != "0")
+
+    return model
+
+def get_x_vars(n, grid_width, dimension, positions_of_ones, layout = "grid"):
+    # the X_ij variable of every cell j for each residue i, and the width of
+    # the grid the cells are numbered on
+    if layout == "pruned":
+        pruned_grid = domains.Domains(n, grid_width, dimension, positions_of_ones)
+
+        return list([pruned_grid.x_vars, pruned_grid.width])
+
+    num_cells = pow(grid_width, dimension)
+    x_vars = [dict((j, i * num_cells + j) for j in range(1, num_cells + 1)) for i in range(0, n)]
+
+    return list([x_vars, grid_width])
+
+def decode_fold(string, grid_width, dimension, model, layout = "grid"):
+    # the fold in a model, as the coordinates of each residue, or None if the
+    # model doesn't place every residue in exactly one cell of a self-avoiding
+    # chain
+    positions_of_ones = [i for i in range(0, len(string)) if string[i] == "1"]
+    x_vars, width = get_x_vars(len(string), grid_width, dimension, positions_of_ones, layout)
+    true_vars = set(x for x in model if x > 0)
+    fold = list()
+
+    for i in range(0, len(string)):
+        cells = [j for j in x_vars[i] if x_vars[i][j] in true_vars]
+
+        if len(cells) != 1:
+            return None
+
+        fold.append(tuple(symmetry.get_coordinates(cells[0], width, dimension)))
+
+    if not folding.is_valid(fold, width):
+        return None
+
+    return fold
+
+def get_ilp_start(string, fold, grid_width, dimension, variable = "X"):
+    # the values of the variables of the HPb ILPs (HPb.pl or HPb1.pl, whose
+    # residue variables are A or X, and HPb1-3D.py) for a fold moved to the
+    # corner of a grid grid_width points wide, as a dict by variable name, or
+    # None if the fold doesn't fit. The ILPs number their points like the cells
+    # of the SAT encodings, and S is left to the caller, since only
+    # HPb1-3D.py has it.
+    corner = [min(point[axis] for point in fold) for axis in range(0, dimension)]
+    cells = list()
+
+    for point in fold:
+        coordinates = [point[axis] - corner[axis] for axis in range(0, dimension)]
+
+        if max(coordinates) >= grid_width:
+            return None
+
+        cells.append(1 + sum(coordinates[axis] * pow(grid_width, axis) for axis in range(0, dimension)))
+
+    grid = lattice.get_lattice(grid_width, dimension)
+    ones = set(cells[i] for i in range(0, len(string)) if string[i] == "1")
+    start = dict()
+
+    for i in range(0, len(string)):
+        for j in range(1, grid.num_cells + 1):
+            start[variable + str(i + 1) + "," + str(j)] = 1 if cells[i] == j else 0
+
+    for j in range(1, grid.num_cells + 1):
+        start["I" + str(j)] = 1 if j in ones else 0
+
+    # every pair of neighbouring H residues is a C, including the ones next to
+    # each other in the chain, which Offset takes off again
+    for j, k in grid.edges:
+        start["C" + str(j) + "," + str(k)] = 1 if j in ones and k in ones else 0
+
+    start["Offset"] = sum(1 for i in range(1, len(string)) if string[i - 1] == "1" and string[i] == "1")
+
+    return start
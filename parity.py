@@ -0,0 +1,65 @@
+# Parity-aware contact layer for the HPsat encodings in 2D and 3D. The square
+# and cubic lattices are bipartite: neighbouring cells have coordinates adding
+# up to numbers of different parity, and the chain alternates between the two
+# classes of cells, so residues i and j can only be on neighbouring cells if
+# j - i is odd. So instead of one "H here" variable T_j per cell, this layer
+# has
+#   * E_j, true only if an even indexed H residue is in cell j
+#   * O_j, true only if an odd indexed H residue is in cell j
+# and one contact variable per edge between two cells of the grid, true only
+# if one end holds an even indexed H and the other an odd indexed one. The
+# edges leaving the grid, which the usual layer keeps as contact variables
+# fixed to false, are left out, and if the sequence has no even or no odd
+# indexed H there are no contact variables at all.
+#
+# The counting conditions only ever ask for contact variables to be true, so
+# the layer only has the clauses that stop a contact variable from being true
+# without a contact: two per cell and two per edge, where the usual layer has
+# one per H residue per cell and three per edge.
+#
+# Variables, after the n * cells X_ij variables:
+#   E_j: n * cells + j
+#   O_j: n * cells + cells + j
+#   contact variable of edge e (from 1): n * cells + 2 * cells + e
+
+from Condition import Condition
+import lattice
+
+def get_num_contact_vars(grid_width, dimension, positions_of_ones):
+    # no contact is possible without an H of each parity
+    if not any(i % 2 == 0 for i in positions_of_ones) or not any(i % 2 == 1 for i in positions_of_ones):
+        return 0
+
+    return dimension * pow(grid_width, dimension - 1) * (grid_width - 1)
+
+def gen_parity_contact_conditions(n, grid_width, dimension, positions_of_ones):
+    num_cells = pow(grid_width, dimension)
+    offset = num_cells * n # existing vars from X_ij conditions
+    E = lambda j: offset + j
+    O = lambda j: offset + num_cells + j
+    contact_conditions = list()
+
+    # E_1 and O_1 need an H of their parity in cell 1, repeated for every cell
+    holds_condition = Condition(list(), True, num_cells, 1)
+    holds_condition.add_clause([-1 * E(1)] + [i * num_cells + 1 for i in positions_of_ones if i % 2 == 0])
+    holds_condition.add_clause([-1 * O(1)] + [i * num_cells + 1 for i in positions_of_ones if i % 2 == 1])
+    contact_conditions.append(holds_condition)
+
+    if get_num_contact_vars(grid_width, dimension, positions_of_ones) == 0:
+        return contact_conditions
+
+    # the contact variable of an edge needs an even H at one end and an odd H
+    # at the other. One cell can't hold both, so an E at either end and an O at
+    # either end is enough.
+    edge_condition = Condition(list())
+    edges = lattice.get_lattice(grid_width, dimension).edges
+
+    for e in range(0, len(edges)):
+        C_e = offset + 2 * num_cells + e + 1
+        j, k = edges[e]
+        edge_condition.add_clause([-1 * C_e, E(j), E(k)])
+        edge_condition.add_clause([-1 * C_e, O(j), O(k)])
+
+    contact_conditions.append(edge_condition)
+
+    return contact_conditions
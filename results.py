@@ -0,0 +1,52 @@
+# Persistent store of the answers the solvers give, so a batch that is stopped
+# and started again skips every probe it already made. The answers go into a
+# SQLite database with one row for each sequence, dimension, grid width,
+# layout, counting encoding and k, holding SAT (10) or UNSAT (20), the solver
+# that answered, its time and, for SAT, the true literals of the model if the
+# solver printed one. The layout is part of the key because the pruned grid
+# holds folds the usual grid of the same width doesn't.
+#
+# Every call opens the database and closes it again, so workers running at the
+# same time never share a connection, and SQLite's locking keeps their writes
+# apart.
+
+import sqlite3
+
+def connect(file):
+    connection = sqlite3.connect(file, timeout=60)
+    connection.execute("CREATE TABLE IF NOT EXISTS probes (sequence TEXT, dimension INTEGER, grid_width INTEGER, layout TEXT, encoding TEXT, k INTEGER, answer INTEGER, solver TEXT, time REAL, model TEXT, PRIMARY KEY (sequence, dimension, grid_width, layout, encoding, k))")
+
+    return connection
+
+def lookup(file, key, k):
+    # the answer, solver and model stored for key (sequence, dimension, grid
+    # width, layout and encoding) and k, or None if there is none
+    connection = connect(file)
+
+    try:
+        return connection.execute("SELECT answer, solver, model FROM probes WHERE sequence = ? AND dimension = ? AND grid_width = ? AND layout = ? AND encoding = ? AND k = ?", tuple(key) + (k,)).fetchone()
+    finally:
+        connection.close()
+
+def get_answers(file, key):
+    # every k stored for key and its answer
+    connection = connect(file)
+
+    try:
+        return dict(connection.execute("SELECT k, answer FROM probes WHERE sequence = ? AND dimension = ? AND grid_width = ? AND layout = ? AND encoding = ?", tuple(key)).fetchall())
+    finally:
+        connection.close()
+
+def record(file, key, k, answer, solver, time, model = None):
+    # store an answer, replacing any stored for the same key and k. model is
+    # a list of literals, of which only the true ones are kept.
+    if model is not None:
+        model = " ".join(str(x) for x in model if x > 0)
+
+    connection = connect(file)
+
+    try:
+        with connection:
+            connection.execute("INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", tuple(key) + (k, answer, solver, time, model))
+    finally:
+        connection.close()
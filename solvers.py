@@ -0,0 +1,161 @@
+# Runs the SAT solvers used by the pipelines, either on a .cnf file that has
+# already been written or by streaming the formula into the solver's stdin
+# while it is being generated, so the solver parses the clauses as they are
+# written and nothing goes to disk. Several solvers can also race on the same
+# file, with limits on their wall time and memory.
+
+import io
+import time
+import queue
+import resource
+import tempfile
+import subprocess
+import threading
+
+def read_stream(stream, output, name):
+    output[name] = stream.read()
+
+def run_solver(command, cnf_file = None, write_cnf = None, capture_output = True):
+    # Run command on cnf_file, or on stdin if write_cnf is given. write_cnf is
+    # called with a text stream connected to the solver's stdin and should write
+    # the whole formula to it. Returns a subprocess.CompletedProcess either way.
+    if write_cnf is None:
+        if capture_output:
+            return subprocess.run(command + [cnf_file], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        else:
+            return subprocess.run(command + [cnf_file])
+
+    output_pipe = subprocess.PIPE if capture_output else None
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=output_pipe, stderr=output_pipe)
+    output = {"stdout": None, "stderr": None}
+    readers = list()
+
+    # the solver's output has to be read while the formula is written, otherwise
+    # a solver that fills its stdout pipe stops reading stdin and both block
+    if capture_output:
+        for name, stream in [("stdout", process.stdout), ("stderr", process.stderr)]:
+            reader = threading.Thread(target=read_stream, args=(stream, output, name))
+            reader.start()
+            readers.append(reader)
+
+    stdin = io.TextIOWrapper(process.stdin)
+
+    try:
+        write_cnf(stdin)
+        stdin.close()
+    except BrokenPipeError:
+        # the solver stopped reading early, its return code says why
+        try:
+            stdin.close()
+        except BrokenPipeError:
+            pass
+
+    process.wait()
+
+    for reader in readers:
+        reader.join()
+
+    return subprocess.CompletedProcess(command, process.returncode, output["stdout"], output["stderr"])
+
+def limit_memory(memory):
+    # function run in the solver's process before it starts, limiting its
+    # address space to memory megabytes
+    def set_limit():
+        limit = memory * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    return set_limit
+
+def start_solver(command, cnf_file, memory = None):
+    # Start command on cnf_file without waiting for it. The solver's output goes
+    # to temporary files rather than pipes, so a run nobody is reading can't
+    # block on a full pipe.
+    stdout = tempfile.TemporaryFile()
+    stderr = tempfile.TemporaryFile()
+    preexec_fn = limit_memory(memory) if memory is not None else None
+    process = subprocess.Popen(command + [cnf_file], stdout=stdout, stderr=stderr, preexec_fn=preexec_fn)
+
+    return process, stdout, stderr
+
+def read_output(stream):
+    stream.seek(0)
+    output = stream.read()
+    stream.close()
+
+    return output
+
+def finish_solver(run):
+    # collect a run that has exited as a CompletedProcess
+    process, stdout, stderr = run
+
+    return subprocess.CompletedProcess(process.args, process.returncode, read_output(stdout), read_output(stderr))
+
+def kill_solver(run):
+    process, stdout, stderr = run
+    process.kill()
+    process.wait()
+    stdout.close()
+    stderr.close()
+
+def wait_solver(run, exited, key):
+    run[0].wait()
+    exited.put((key, run))
+
+def watch_solver(run, exited, key):
+    # put (key, run) in the queue exited once the run has exited, so several
+    # runs can be waited on at once instead of polling them
+    watcher = threading.Thread(target=wait_solver, args=(run, exited, key), daemon=True)
+    watcher.start()
+
+def wait_for_solvers(exited, timeout = None):
+    # the (key, run) pairs of the watched runs that have exited, waiting up to
+    # timeout seconds for the first of them, or as long as it takes if timeout
+    # is None
+    pairs = list()
+
+    try:
+        pairs.append(exited.get(timeout=timeout))
+
+        while True:
+            pairs.append(exited.get_nowait())
+    except queue.Empty:
+        pass
+
+    return pairs
+
+def race(commands, cnf_file, timeout = None, memory = None):
+    # Run every command on cnf_file at the same time and return the first SAT
+    # (10) or UNSAT (20) answer as a CompletedProcess whose args is the command
+    # that won, killing the others. Runs that fail, for example by going over
+    # the memory limit, drop out of the race. If none answers within timeout
+    # seconds, or all of them fail, the return code is 0 and stderr says why.
+    runs = [start_solver(command, cnf_file, memory) for command in commands]
+    exited = queue.Queue()
+    start = time.time()
+    errors = list()
+
+    for run in runs:
+        watch_solver(run, exited, None)
+
+    try:
+        while len(runs) > 0:
+            wait = None if timeout is None else max(0, start + timeout - time.time())
+            finished = wait_for_solvers(exited, wait)
+
+            if len(finished) == 0:
+                errors.append("no solver answered within " + str(timeout) + " seconds")
+                break
+
+            for key, run in finished:
+                runs.remove(run)
+                result = finish_solver(run)
+
+                if result.returncode == 10 or result.returncode == 20:
+                    return result
+
+                errors.append(" ".join(result.args) + " exited with " + str(result.returncode) + ": " + result.stderr.decode(errors="replace"))
+    finally:
+        for run in runs:
+            kill_solver(run)
+
+    return subprocess.CompletedProcess(commands, 0, None, "\n".join(errors))
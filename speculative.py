@@ -0,0 +1,148 @@
+# Parallel speculative search for the largest k a formula is satisfiable for.
+# Instead of probing one k at a time, several k are solved at once: the doubling
+# ladder 1, 2, 4, ... until some k is UNSAT, then a multi-way split of the
+# interval between the largest SAT k and the smallest UNSAT k. Every answer
+# narrows the interval, and runs whose k falls outside it are killed. Given an
+# upper bound on k, the ladder stops at the bound and the search ends as soon
+# as the bound is SAT.
+
+import os
+import time
+import queue
+import solvers
+
+def next_probes(lo, hi, running, num_free, max_k = None):
+    # pick up to num_free new values of k to probe, given that lo is SAT, hi is
+    # UNSAT (None if no UNSAT k is known yet), the values in running are
+    # already being solved and no k above max_k can be SAT
+    probes = list()
+
+    if hi is None and max_k is not None and max([lo] + list(running)) >= max_k:
+        # the ladder already reached the bound, only the gaps below it are left
+        hi = max_k + 1
+
+    if hi is None:
+        # keep climbing the doubling ladder above everything tried so far
+        k = max([lo] + list(running))
+
+        for x in range(0, num_free):
+            k = 2 * k if k > 0 else 1
+
+            if max_k is not None and k >= max_k:
+                # the ladder tops out at the bound and the other free runs
+                # split the gaps below it
+                probes.append(max_k)
+                return probes + next_probes(lo, max_k + 1, list(running) + probes, num_free - len(probes))
+
+            probes.append(k)
+
+        return probes
+
+    # split the largest gap between the k values already known or being solved
+    # until every free run has a k or there's nothing left to split
+    points = sorted(set([lo, hi] + [k for k in running if lo < k < hi]))
+
+    for x in range(0, num_free):
+        gap, i = max((points[i + 1] - points[i], i) for i in range(0, len(points) - 1))
+
+        if gap < 2:
+            break
+
+        k = points[i] + (gap + 1) // 2
+        probes.append(k)
+        points.insert(i + 1, k)
+
+    return probes
+
+def search(write_cnf, cnf_file, solver, num_probes, stats, memory = None, max_k = None, min_k = 0, decode = None, record = None, timeout = None):
+    # Find the largest k the formula is SAT for with up to num_probes solver runs
+    # at once. write_cnf(k, file) writes the formula for k to file, and
+    # cnf_file(k) names the file for k. stats gets the number of runs started,
+    # the k values whose runs were wasted (killed, or answered something already
+    # known) and the wall time of the search. Each file is removed once its run
+    # is over. memory limits every run to that many megabytes, max_k is an
+    # upper bound on k, if one is known, and min_k a k already known to be SAT.
+    # decode(k, result), if given, reads the number of contacts out of the
+    # model of a SAT run for k, so the search can skip every k up to it, and
+    # record(k, result, time), if given, is called with every SAT or UNSAT
+    # answer and the wall time of its run. timeout, if given, limits the wall
+    # time of every run. A run still needed that goes over it, or fails, ends
+    # the search with the largest k known to be SAT as a lower bound, and
+    # stats["stopped"] says why (None if the search finished).
+    lo = min_k # largest k known to be SAT, k = 0 always is
+    hi = None # smallest k known to be UNSAT
+    running = dict() # k -> run started by solvers.start_solver
+    started = dict() # k -> time its run started
+    exited = queue.Queue() # (k, run) of every run that has exited
+    stats["runs"] = 0
+    stats["wasted"] = list()
+    stats["stopped"] = None
+    start = time.time()
+
+    try:
+        while (hi is None or hi - lo > 1) and (max_k is None or lo < max_k):
+            for k in next_probes(lo, hi, running, num_probes - len(running), max_k):
+                print("Generating file with k =", k)
+                write_cnf(k, cnf_file(k))
+                print("Calling", solver[0], "for k =", k)
+                running[k] = solvers.start_solver(solver, cnf_file(k), memory)
+                started[k] = time.time()
+                solvers.watch_solver(running[k], exited, k)
+                stats["runs"] += 1
+
+            # wait for the next run to exit, or for the oldest run to run out
+            # of time. Runs that were killed exit too, and are left out.
+            wait = None if timeout is None else max(0, min(started[k] for k in running) + timeout - time.time())
+            finished = [k for k, run in solvers.wait_for_solvers(exited, wait) if running.get(k) is run]
+
+            for k in finished:
+                result = solvers.finish_solver(running.pop(k))
+                os.remove(cnf_file(k))
+
+                if record is not None and (result.returncode == 10 or result.returncode == 20):
+                    record(k, result, time.time() - started[k])
+
+                if result.returncode == 10:
+                    print("k =", k, "is SAT")
+                    found = k if decode is None else decode(k, result)
+
+                    if found > lo:
+                        lo = found
+                    else:
+                        stats["wasted"].append(k)
+                elif result.returncode == 20:
+                    print("k =", k, "is UNSAT")
+
+                    if hi is None or k < hi:
+                        hi = k
+                    else:
+                        stats["wasted"].append(k)
+                else:
+                    print(result.stderr)
+                    print("ERROR: unexpected return code", result.returncode, "for k =", k)
+                    stats["stopped"] = "no answer for k = " + str(k) + ": return code " + str(result.returncode)
+                    return lo
+
+            # runs for k values the answers so far settle are no longer needed
+            for k in list(running):
+                if k <= lo or (hi is not None and k >= hi):
+                    print("Killing the run for k =", k)
+                    solvers.kill_solver(running.pop(k))
+                    os.remove(cnf_file(k))
+                    stats["wasted"].append(k)
+
+            # a run still needed that went over the time limit ends the search
+            for k in running:
+                if timeout is not None and time.time() - started[k] >= timeout:
+                    print("ERROR: no answer within", timeout, "seconds for k =", k)
+                    stats["stopped"] = "no answer for k = " + str(k) + ": no solver answered within " + str(timeout) + " seconds"
+                    return lo
+    finally:
+        for k in list(running):
+            solvers.kill_solver(running.pop(k))
+            os.remove(cnf_file(k))
+            stats["wasted"].append(k)
+
+        stats["time"] = time.time() - start
+
+    return lo
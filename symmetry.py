@@ -0,0 +1,95 @@
+# Symmetry breaking clauses for the HPsat encodings in 2D and 3D. Every fold
+# that fits in the grid can be rotated, reflected and moved around in it, and
+# without these clauses the solver has to rule out each of those copies on its
+# own, which is what makes the last, UNSAT, probe of a search so expensive.
+#
+# The grid is a square or cube, so it maps onto itself under every rotation and
+# reflection of the lattice, and any fold in it can be turned so that
+#   * the first step, from residue 1 to residue 2, goes along +x, and
+#   * the first step that doesn't go along +x goes along +y,
+# and then moved without turning it so that
+#   * residue 1 is in the center cell, if the grid is wide enough (2n - 1 cells)
+#     for every fold to fit around the center, or otherwise
+#   * some residue is in the first plane of the grid along every axis, which
+#     any fold can be moved against.
+# So these clauses keep at least one copy of every fold the grid holds, and the
+# maximum number of contacts doesn't change.
+
+from Condition import Condition
+
+def get_coordinates(cell, grid_width, dimension):
+    # x, y (and z) of a cell, numbered from 1 with x changing fastest
+    return [((cell - 1) // pow(grid_width, axis)) % grid_width for axis in range(0, dimension)]
+
+def get_center(grid_width, dimension):
+    return 1 + sum((grid_width // 2) * pow(grid_width, axis) for axis in range(0, dimension))
+
+def gen_symmetry_conditions(n, grid_width, dimension):
+    num_cells = pow(grid_width, dimension)
+    symmetry_conditions = list()
+
+    if n < 2:
+        return symmetry_conditions
+
+    # X_ij, residue i (from 0) in cell j
+    var = lambda i, j: i * num_cells + j
+
+    if grid_width >= 2 * n - 1:
+        # residue 1 goes in the center cell
+        center = get_center(grid_width, dimension)
+        symmetry_conditions.append(Condition([[var(0, center)]]))
+        starts = [center]
+    else:
+        # the fold touches the first plane along every axis
+        translation_condition = Condition(list())
+
+        for axis in range(0, dimension):
+            clause = list()
+
+            for i in range(0, n):
+                for j in range(1, num_cells + 1):
+                    if get_coordinates(j, grid_width, dimension)[axis] == 0:
+                        clause.append(var(i, j))
+
+            translation_condition.add_clause(clause)
+
+        symmetry_conditions.append(translation_condition)
+        starts = range(1, num_cells + 1)
+
+    # the first step goes along +x
+    first_step_condition = Condition(list())
+
+    for j in starts:
+        if get_coordinates(j, grid_width, dimension)[0] < grid_width - 1:
+            first_step_condition.add_clause([-1 * var(0, j), var(1, j + 1)])
+        else:
+            first_step_condition.add_clause([-1 * var(0, j)])
+
+    symmetry_conditions.append(first_step_condition)
+
+    # the first turn goes along +y. Residue i is i cells along +x from residue
+    # 1 only if every step before it went along +x, and then residue i + 1
+    # can't go along -y, +z or -z.
+    first_turn_condition = Condition(list())
+    turns = [(1, -1)] # axis and sign of -y
+
+    if dimension == 3:
+        turns.extend([(2, 1), (2, -1)]) # +z and -z
+
+    for j in starts:
+        x = get_coordinates(j, grid_width, dimension)[0]
+
+        for i in range(1, n - 1):
+            if x + i > grid_width - 1:
+                break
+
+            coordinates = get_coordinates(j + i, grid_width, dimension)
+
+            for axis, sign in turns:
+                if 0 <= coordinates[axis] + sign < grid_width:
+                    target = j + i + sign * pow(grid_width, axis)
+                    first_turn_condition.add_clause([-1 * var(0, j), -1 * var(i, j + i), -1 * var(i + 1, target)])
+
+    symmetry_conditions.append(first_turn_condition)
+
+    return symmetry_conditions